@@ -0,0 +1,308 @@
+"""검색어·개정 단어 쌍을 한꺼번에 처리하는 명령줄 일괄 처리기.
+
+작업 파일은 JSONL(한 줄에 {"query": ...} 또는 {"find": ..., "replace": ...}, "id"는 선택)이나
+같은 열 이름을 가진 CSV다. 법령 목록 조회와 본문 받기는 이 프로세스가 디스크 캐시를 거쳐 한 번씩만 하고,
+파싱과 매칭은 프로세스 풀이 나눠 맡는다. 여러 작업에 걸친 법령은 한 번만 파싱해 그 법령이 필요한
+모든 작업을 함께 처리한다. 작업 하나가 끝날 때마다 결과를 JSONL 한 줄로 바로 쓴다.
+
+    python app/law_batch.py jobs.jsonl -o results.jsonl
+    python app/law_batch.py pairs.csv -o amendments.jsonl --processes 4 --mirror
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import law_processor
+from law_match import AhoCorasick
+from law_model import parse_law, raw_text_clean
+
+# 파싱을 기다리는 법령 수를 프로세스 수의 몇 배까지 둘지. 본문이 메모리에 너무 쌓이지 않게 한다
+IN_FLIGHT_PER_PROCESS = 4
+
+
+def read_jobs(path):
+    """작업 파일을 읽어 {"id", "type", "query" 또는 "find"/"replace"} 목록으로. 형식이 틀리면 ValueError"""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = []
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{line_no}번째 줄: {e}") from e
+    jobs = []
+    for no, row in enumerate(rows, 1):
+        job_id = str(row.get("id") or no)
+        find_word = (row.get("find") or "").strip()
+        replace_word = (row.get("replace") or "").strip()
+        query = (row.get("query") or "").strip()
+        if find_word and replace_word:
+            jobs.append({"id": job_id, "type": "amend", "find": find_word, "replace": replace_word})
+        elif query:
+            jobs.append({"id": job_id, "type": "search", "query": query})
+        else:
+            raise ValueError(f"{no}번째 작업: query 또는 find/replace가 필요합니다")
+    return jobs
+
+
+def _job_key(job):
+    if job["type"] == "search":
+        return ("search", job["query"])
+    return ("amend", job["find"], job["replace"])
+
+
+# 작업자 프로세스 안에서 작업별 매칭 도구를 기억해 둔다
+_prepared = {}
+
+
+def _prepare(key):
+    prepared = _prepared.get(key)
+    if prepared is None:
+        if key[0] == "search":
+            cq = law_processor.CompiledQuery(key[1])
+            prepared = (cq, law_processor.make_prefilter([cq.keyword_clean]), None)
+        else:
+            cq = law_processor.CompiledQuery(key[1], key[2])
+            prepared = (cq, law_processor.make_prefilter([key[1]]), AhoCorasick([key[1]]))
+        _prepared[key] = prepared
+    return prepared
+
+
+def _match(key, doc, law_name, idx):
+    cq, _, matcher = _prepare(key)
+    if key[0] == "search":
+        return law_processor.search_law(doc, cq) or None
+    chunk_map = law_processor.collect_chunks(doc, matcher, {key[1]: cq})
+    if not chunk_map:
+        return None
+    text = law_processor.format_amendment(law_processor.amendment_prefix(idx), law_name, chunk_map, cq.josa_rule)
+    locations = [
+        {
+            "찾은 말": chunk + (suffix or ""),
+            "바꿀 말": replaced + (suffix or ""),
+            "위치": [law_processor.format_location(loc) for loc in sorted(set(locs))],
+        }
+        for (chunk, replaced, josa, suffix), locs in chunk_map.items()
+    ]
+    return {"text": text, "locations": locations}
+
+
+def process_law(law_name, xml_data, tasks):
+    """법령 하나를 한 번 파싱해 tasks [(작업 번호, 작업 key, 목록 순번)]를 모두 처리한다.
+
+    [(작업 번호, 결과)]를 돌려준다. 결과는 검색이면 조문 HTML 목록, 개정이면 text·locations dict,
+    찾은 것이 없으면 None이다. 형식이 잘못된 본문이면 ET.ParseError
+    """
+    raw = None
+    wanted = []
+    for task in tasks:
+        prefilter = _prepare(task[1])[1]
+        if prefilter is not None:
+            if raw is None:
+                raw = raw_text_clean(xml_data)
+            if not prefilter(raw):
+                continue
+        wanted.append(task)
+    results = {no: None for no, _, _ in tasks}
+    if wanted:
+        doc = parse_law(xml_data)
+        for no, key, idx in wanted:
+            results[no] = _match(key, doc, law_name, idx)
+    return list(results.items())
+
+
+class _InlineExecutor:
+    """--processes 1일 때 풀 없이 이 프로세스에서 바로 처리한다"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class _JobState:
+    __slots__ = ("job", "laws", "error", "results", "failures", "remaining")
+
+    def __init__(self, job, laws, error=None):
+        self.job = job
+        self.laws = laws
+        self.error = error
+        self.results = {}
+        self.failures = []
+        self.remaining = len(laws)
+
+    def record(self):
+        """끝난 작업의 출력 한 줄"""
+        record = dict(self.job)
+        hits = [(law, self.results[law["MST"]]) for law in self.laws if self.results.get(law["MST"])]
+        if self.job["type"] == "search":
+            record["results"] = [{"법령명": law["법령명"], "MST": law["MST"], "sections": sections}
+                                 for law, sections in hits]
+        else:
+            record["amendments"] = [{"법령명": law["법령명"], "MST": law["MST"], **result} for law, result in hits]
+        record["laws"] = len(self.laws)
+        record["failures"] = self.failures
+        if self.error is not None:
+            # 목록을 받지 못한 작업은 결과가 비어 있어도 "찾은 것 없음"이 아니다
+            record["error"] = self.error
+        return record
+
+
+def run_jobs(jobs, write, processes=None, fetch_workers=None, use_mirror=False, progress=None):
+    """작업을 모두 처리하고 끝나는 대로 write(record)를 부른다. 처리량 통계 dict를 돌려준다.
+
+    법령 목록을 받지 못한 작업은 결과 없이 error를 담은 레코드로 쓴다.
+    processes는 파싱·매칭 프로세스 수(기본은 CPU 수), fetch_workers는 목록·본문을 받는 스레드 수다.
+    progress를 주면 법령 하나가 끝날 때마다 progress(처리한 법령 수, 전체 법령 수, 끝난 작업 수)를 부른다.
+    """
+    started = time.perf_counter()
+    fetch_workers = fetch_workers or law_processor.FETCH_WORKERS
+    processes = processes or os.cpu_count() or 1
+
+    def word(job):
+        return job["query"] if job["type"] == "search" else job["find"]
+
+    def listing(job):
+        try:
+            return law_processor.get_law_list_from_api(word(job)), None
+        except law_processor.LawApiError as e:
+            return [], f"법령 목록을 받지 못했습니다: {e}"
+
+    if use_mirror:
+        # 미러는 작업마다 훑지 않고 모든 작업의 단어를 한 번에 찾는다
+        found = law_processor.get_mirror().find_each({word(job) for job in jobs})
+        states = [_JobState(job, found[word(job)]) for job in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=min(fetch_workers, len(jobs)) or 1) as pool:
+            states = [_JobState(job, *listed) for job, listed in zip(jobs, pool.map(listing, jobs))]
+    listed = time.perf_counter()
+
+    # 앞 작업의 법령부터 처리해 앞 작업이 먼저 끝나게 한다
+    tasks_by_mst = {}
+    all_laws = []
+    for no, state in enumerate(states):
+        for idx, law in enumerate(state.laws):
+            tasks = tasks_by_mst.get(law["MST"])
+            if tasks is None:
+                tasks = tasks_by_mst[law["MST"]] = []
+                all_laws.append(law)
+            tasks.append((no, _job_key(state.job), idx))
+
+    done_jobs = 0
+    done_laws = 0
+    total_bytes = 0
+
+    def finish_law(law, results=None, error=None):
+        nonlocal done_jobs, done_laws
+        done_laws += 1
+        for no, _, _ in tasks_by_mst[law["MST"]]:
+            state = states[no]
+            if error is not None:
+                state.failures.append({"법령명": law["법령명"], "MST": law["MST"], "사유": str(error)})
+            elif results.get(no) is not None:
+                state.results[law["MST"]] = results[no]
+            state.remaining -= 1
+            if state.remaining == 0:
+                write(state.record())
+                done_jobs += 1
+        if progress is not None:
+            progress(done_laws, len(all_laws), done_jobs)
+
+    for state in states:
+        if not state.laws:
+            write(state.record())
+            done_jobs += 1
+
+    load = law_processor.get_mirror().load if use_mirror else law_processor.load_law_text
+    executor = _InlineExecutor() if processes <= 1 else ProcessPoolExecutor(max_workers=processes)
+    pending = {}
+
+    def drain():
+        completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in completed:
+            law = pending.pop(future)
+            try:
+                results = dict(future.result())
+            except Exception as e:
+                finish_law(law, error=e)
+            else:
+                finish_law(law, results)
+
+    try:
+        for law, xml_data, error in law_processor.iter_law_texts(all_laws, fetch_workers, load=load):
+            if error is not None or not xml_data:
+                finish_law(law, error=error or "빈 본문")
+                continue
+            total_bytes += len(xml_data)
+            pending[executor.submit(process_law, law["법령명"], xml_data, tasks_by_mst[law["MST"]])] = law
+            while len(pending) >= processes * IN_FLIGHT_PER_PROCESS:
+                drain()
+        while pending:
+            drain()
+    finally:
+        executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "jobs": len(jobs),
+        "listing_errors": sum(state.error is not None for state in states),
+        "laws": len(all_laws),
+        "bytes": total_bytes,
+        "listing_seconds": listed - started,
+        "seconds": elapsed,
+        "laws_per_second": len(all_laws) / elapsed if elapsed else 0.0,
+        "jobs_per_second": len(jobs) / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색어·개정 단어 쌍 일괄 처리")
+    parser.add_argument("jobs", help="작업 파일(JSONL 또는 CSV)")
+    parser.add_argument("-o", "--output", help="결과 JSONL 파일(주지 않으면 표준 출력)")
+    parser.add_argument("--processes", type=int, default=None, help="파싱·매칭 프로세스 수(기본: CPU 수, 1이면 풀 없이)")
+    parser.add_argument("--fetch-workers", type=int, default=None, help="목록·본문을 받는 스레드 수")
+    parser.add_argument("--mirror", action="store_true", help="API 대신 로컬 미러(law_mirror.py sync)에서 읽는다")
+    args = parser.parse_args()
+
+    try:
+        jobs = read_jobs(args.jobs)
+    except (OSError, ValueError) as e:
+        sys.exit(f"작업 파일 오류: {e}")
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    def write(record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    def progress(done_laws, total_laws, done_jobs):
+        print(f"\r법령 {done_laws}/{total_laws}, 작업 {done_jobs}/{len(jobs)}", end="", file=sys.stderr, flush=True)
+
+    try:
+        stats = run_jobs(jobs, write, args.processes, args.fetch_workers, args.mirror, progress)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(file=sys.stderr)
+    print(f"작업 {stats['jobs']}건, 법령 {stats['laws']}건({stats['bytes'] / 1048576:.1f}MB), "
+          f"{stats['seconds']:.1f}초 (목록 {stats['listing_seconds']:.1f}초): "
+          f"{stats['laws_per_second']:.1f} laws/sec, {stats['jobs_per_second']:.2f} jobs/sec", file=sys.stderr)
+    if stats["listing_errors"]:
+        sys.exit(f"작업 {stats['listing_errors']}건은 법령 목록을 받지 못했습니다(결과의 error 참고)")
+
+
+if __name__ == "__main__":
+    main()
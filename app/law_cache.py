@@ -0,0 +1,195 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+# 법령일련번호(MST)는 특정 시점의 법령 한 판본을 가리키므로 본문 XML이 바뀌지 않는다.
+# 그래서 한 번 받은 본문은 디스크에 압축해 두고 다시 쓴다.
+DEFAULT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".law_cache"))
+CACHE_DIR = os.getenv("LAW_CACHE_DIR", DEFAULT_DIR)
+CACHE_MAX_BYTES = int(os.getenv("LAW_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# 읽을 때마다 사용 시각을 쓰면 읽기끼리도 sqlite 쓰기 잠금을 기다리므로 이 간격(초)마다 모아서 쓴다
+ACCESS_FLUSH_SECONDS = float(os.getenv("LAW_CACHE_ACCESS_FLUSH", "30"))
+# 저장 중 다른 프로세스가 같은 본문 파일을 지웠을 때 다시 써 보는 횟수
+PUT_RETRIES = 3
+
+
+class LawTextCache:
+    """MST → 법령 본문 XML 디스크 캐시.
+
+    본문은 내용 해시(sha256) 이름의 zlib 압축 파일로 저장하고, MST와 해시의 대응과
+    마지막 사용 시각은 sqlite 색인에 둔다. 사용 시각은 메모리에 모았다가 ACCESS_FLUSH_SECONDS마다,
+    그리고 정리하기 전에 한꺼번에 쓴다. 전체 크기가 max_bytes를 넘으면 가장 오래
+    쓰지 않은 본문부터 지운다. sqlite 잠금과 원자적 파일 교체 덕분에 여러 세션과
+    프로세스가 같은 디렉터리를 함께 써도 된다.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(directory, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}
+        self._flushed = time.monotonic()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "digest TEXT PRIMARY KEY, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS refs (mst TEXT PRIMARY KEY, digest TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS blobs_accessed ON blobs (accessed)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _blob_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _touch(self, digest):
+        with self._lock:
+            self._touched[digest] = time.time()
+            due = time.monotonic() - self._flushed >= ACCESS_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        """모아 둔 사용 시각을 색인에 쓴다"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._flushed = time.monotonic()
+        if not touched:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany("UPDATE blobs SET accessed = MAX(accessed, ?) WHERE digest = ?",
+                             [(accessed, digest) for digest, accessed in touched.items()])
+
+    def __contains__(self, mst):
+        """본문을 읽지 않고 색인만 본다"""
+        row = self._connect().execute("SELECT 1 FROM refs WHERE mst = ?", (str(mst),)).fetchone()
+        return row is not None
+
+    def get(self, mst):
+        """캐시에 있으면 본문 bytes를, 없으면 None을 돌려준다"""
+        conn = self._connect()
+        row = conn.execute("SELECT digest FROM refs WHERE mst = ?", (str(mst),)).fetchone()
+        if row is None:
+            self._count(False)
+            return None
+        digest = row[0]
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            # 다른 프로세스가 지웠거나 깨진 파일이면 색인에서 빼고 없는 것으로 본다
+            with conn:
+                conn.execute("DELETE FROM refs WHERE mst = ?", (str(mst),))
+                conn.execute("DELETE FROM blobs WHERE digest = ? AND digest NOT IN (SELECT digest FROM refs)", (digest,))
+            self._count(False)
+            return None
+        self._touch(digest)
+        self._count(True)
+        return data
+
+    def put(self, mst, data):
+        """본문을 저장하고 용량을 넘으면 오래된 항목을 정리한다"""
+        if not data:
+            return
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        for attempt in range(PUT_RETRIES):
+            if not os.path.exists(path):
+                self._write_blob(path, data)
+            try:
+                size = os.path.getsize(path)
+                break
+            except FileNotFoundError:
+                # 있는지 본 직후 다른 프로세스가 정리하며 지웠다. 다시 쓴다
+                if attempt == PUT_RETRIES - 1:
+                    raise
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO blobs (digest, size, accessed) VALUES (?, ?, ?)",
+                (digest, size, time.time()),
+            )
+            conn.execute("INSERT OR REPLACE INTO refs (mst, digest) VALUES (?, ?)", (str(mst), digest))
+        self._evict()
+
+    def _write_blob(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _evict(self):
+        self.flush()
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        with conn:
+            for digest, size in conn.execute("SELECT digest, size FROM blobs ORDER BY accessed").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                conn.execute("DELETE FROM refs WHERE digest = ?", (digest,))
+                victims.append(digest)
+                total -= size
+        for digest in victims:
+            # 지우는 사이 다른 프로세스가 같은 본문을 다시 넣었으면 남겨 둔다
+            if conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone():
+                continue
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+    def stats(self):
+        """적중/실패 횟수와 현재 저장 용량"""
+        conn = self._connect()
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {"hits": hits, "misses": misses, "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """프로세스 공용 캐시. LAW_CACHE_MAX_BYTES=0이면 캐시를 쓰지 않는다(None)."""
+    global _default_cache
+    if CACHE_MAX_BYTES <= 0:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LawTextCache()
+        return _default_cache
@@ -0,0 +1,155 @@
+import bisect
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 법제처 Open API(DRF) 공용 HTTP 클라이언트.
+# 연결을 재사용하고, 일시적인 오류는 다시 시도하고, 동시에 많이 불러도 OC 키가 막히지 않도록 호출 속도를 제한한다.
+API_BASE = os.getenv("LAW_API_BASE", "http://www.law.go.kr")
+OC = os.getenv("OC", "chetera")
+HTTP_POOL_SIZE = int(os.getenv("LAW_HTTP_POOL", "16"))
+HTTP_TIMEOUT = float(os.getenv("LAW_HTTP_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("LAW_HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("LAW_HTTP_BACKOFF", "0.5"))
+# 초당 요청 수와 순간 허용량. 0이면 제한하지 않는다
+RATE_LIMIT = float(os.getenv("LAW_API_RATE", "20"))
+RATE_BURST = int(os.getenv("LAW_API_BURST", "20"))
+
+RETRY_STATUS = {500, 502, 503, 504}
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LawApiError(Exception):
+    """재시도 후에도 응답을 받지 못했거나 200이 아닌 응답을 받은 경우"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 모이는 토큰 버킷"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 기다린다"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class LatencyHistogram:
+    """구간별 응답 시간 누적 히스토그램"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "counts": list(self.counts),
+                "count": self.count,
+                "sum": self.total,
+            }
+
+
+class LawClient:
+    """keep-alive 세션, 지수 백오프 재시도, 호출 속도 제한을 갖춘 DRF 클라이언트"""
+
+    def __init__(self, base=API_BASE, oc=OC, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT,
+                 retries=HTTP_RETRIES, backoff=HTTP_BACKOFF, rate=RATE_LIMIT, burst=RATE_BURST):
+        self.base = base.rstrip("/")
+        self.oc = oc
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency = {}
+        self._latency_lock = threading.Lock()
+
+    def _histogram(self, endpoint):
+        with self._latency_lock:
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = LatencyHistogram()
+            return histogram
+
+    def get(self, endpoint, **params):
+        """DRF 엔드포인트(lawSearch, lawService 등)를 불러 응답 본문 bytes를 돌려준다"""
+        url = f"{self.base}/DRF/{endpoint}.do"
+        params = {"OC": self.oc, **params}
+        histogram = self._histogram(endpoint)
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                res = self.session.get(url, params=params, timeout=self.timeout)
+                error = None
+            except (requests.Timeout, requests.ConnectionError) as e:
+                res, error = None, e
+            histogram.observe(time.monotonic() - started)
+            retryable = error is not None or res.status_code in RETRY_STATUS
+            if not retryable or attempt >= self.retries:
+                break
+            # 0.5, 1, 2초 ... 에 약간의 흔들림을 더해 여러 작업자가 한꺼번에 재시도하지 않게 한다
+            time.sleep(self.backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+            attempt += 1
+        if error is not None:
+            raise LawApiError(f"{endpoint}: {error}") from error
+        if res.status_code != 200:
+            raise LawApiError(f"{endpoint}: HTTP {res.status_code}", status=res.status_code)
+        return res.content
+
+    def latency_stats(self):
+        """엔드포인트별 응답 시간 히스토그램"""
+        with self._latency_lock:
+            items = list(self.latency.items())
+        return {endpoint: histogram.snapshot() for endpoint, histogram in items}
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """프로세스 공용 클라이언트"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = LawClient()
+        return _default_client
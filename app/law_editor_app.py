@@ -1,45 +1,246 @@
 import streamlit as st
 import os
-import importlib.util
+import sys
+import time
+from bisect import bisect_right
+from functools import partial
 
 st.set_page_config(layout="wide")
 
 st.markdown("<h1 style='font-size:20px;'>📘 부칙개정 도우미 (100.001.14.07)</h1>", unsafe_allow_html=True)
 
 base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
-processor_path = os.path.join(base_dir, "law_processor.py")
-spec = importlib.util.spec_from_file_location("law_processor", processor_path)
-law_processor = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(law_processor)
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+# 스크립트는 누를 때마다 처음부터 다시 돌지만 import한 모듈은 남으므로 목록 캐시 등 모듈 상태가 세션과 재실행을 넘어 유지된다
+import law_processor  # noqa: E402
 
 run_amendment_logic = law_processor.run_amendment_logic
 # run_search_logic = lambda q, u: {}  # placeholder (기본형에서 미사용)
 run_search_logic = law_processor.run_search_logic 
 
+def show_timing(metrics):
+    """단계별 시간 패널"""
+    summary = metrics.summary()
+    if not summary:
+        return
+    with st.expander(f"⏱ 단계별 시간 (전체 {summary['wall_seconds']:.1f}초)"):
+        st.table([
+            {"단계": name, "시간(초)": round(stage["seconds"], 3), "횟수": stage["calls"]}
+            for name, stage in summary["stages"].items()
+        ])
+        fetch = summary["fetch"]
+        st.markdown(
+            f"- 본문 {fetch['count']}건 (캐시 {fetch['cached']}건), {fetch['bytes'] / 1048576:.1f}MB, 받기 시간 합계 {fetch['seconds']:.1f}초\n"
+            + "".join(f"- {name}: {n:,}\n" for name, n in summary["counters"].items())
+        )
+        if fetch["slowest"]:
+            st.caption("가장 오래 걸린 본문")
+            st.table([{"MST": f["MST"], "시간(초)": round(f["seconds"], 3), "크기(KB)": f["bytes"] // 1024} for f in fetch["slowest"]])
+        st.caption("Prometheus 형식 누적값")
+        st.code(law_processor.metrics_text(), language="text")
+
+RESULT_PAGE_SIZE = 20
+# 실행 중 첫 쪽 미리 보기를 다시 그리는 최소 간격(초)
+PREVIEW_INTERVAL = 0.5
+
+def save_results(key, message, entries=(), empty_message=None, name=None, label=None, run=None, kinds=("법률",)):
+    """결과를 세션에 넣어 둔다. 다른 위젯을 눌러 스크립트가 다시 돌아도 다시 계산하지 않는다.
+
+    entries는 법령명과 sections(검색 조문 HTML 목록) 또는 text(개정문)를 담은 dict 목록이다.
+    message의 {found}는 결과 법령 수로 바뀐다. run은 resume·continuation·metrics 키워드를 받아 항목을
+    돌려주는 law_processor.iter_* 호출로, 시간 제한에 걸렸을 때 "계속"으로 이어 부른다.
+    """
+    runs = st.session_state.get("result_runs", 0) + 1
+    st.session_state["result_runs"] = runs
+    saved = st.session_state[key] = {
+        "run_id": runs,
+        "message": message,
+        "entries": list(entries),
+        "failures": [],
+        "empty_message": empty_message,
+        "name": name,
+        "label": label,
+        "run": run,
+        "continuation": {},
+        "kinds": kinds,
+        "error": None,
+        "metrics": law_processor.NULL_METRICS,
+    }
+    return saved
+
+def entry_order(entry):
+    """결과 항목의 보여 주는 순서. 종류, 종류 안의 목록 순서"""
+    return list(law_processor.LAW_KINDS).index(entry["법령종류"]), entry["index"]
+
+def show_preview(placeholder, saved):
+    """실행 중에 지금까지 찾은 결과의 첫 쪽을 placeholder에 그린다. 검색 조문은 끝난 뒤 펼쳐 볼 수 있다"""
+    entries = saved["entries"]
+    with placeholder.container():
+        st.caption(f"지금까지 {len(entries)}개 법령에서 찾았습니다. 첫 쪽을 미리 보여 주며, 끝나면 모든 쪽과 조문을 볼 수 있습니다.")
+        kind = None
+        for entry in entries[:RESULT_PAGE_SIZE]:
+            if len(saved["kinds"]) > 1 and entry["법령종류"] != kind:
+                kind = entry["법령종류"]
+                st.markdown(f"#### {kind}")
+            if "text" in entry:
+                st.markdown(entry["text"], unsafe_allow_html=True)
+            else:
+                st.markdown(f"📄 {entry['법령명']} ({len(entry['sections'])}건)")
+
+def collect_results(saved, resume=None):
+    """saved["run"]을 (이어서) 돌려 나오는 항목을 saved에 붙인다.
+
+    진행 상황과 함께 첫 쪽에 들 결과가 바뀔 때마다 첫 쪽을 미리 보여 준다. 끝나면 미리 보기를 지우고
+    show_results가 쪽 나눔과 펼쳐 보기로 다시 그린다.
+    """
+    saved["continuation"] = {}
+    saved["error"] = None
+    metrics = saved["metrics"] = law_processor.new_metrics(saved["name"], show_timings or None)
+    label = saved["label"]
+    progress = st.progress(0.0, text=label)
+    preview = st.empty()
+    # 종류별로 동시에, 본문을 이미 가진 법령부터 처리하므로 종류·목록 순서 자리에 끼워 넣는다
+    saved["entries"].sort(key=entry_order)
+    stale = False
+    drawn = 0.0
+    try:
+        for item in saved["run"](resume=resume, continuation=saved["continuation"], metrics=metrics):
+            progress.progress(item["done"] / item["total"], text=f"{label} {item['done']}/{item['total']}개 법령 확인, {len(saved['entries'])}개 찾음 ({item['bytes'] / 1048576:.1f}MB)")
+            if item["error"] is not None:
+                saved["failures"].append({"법령명": item["법령명"], "MST": item["MST"]})
+            elif item.get("sections") or item.get("text"):
+                entry = {k: item[k] for k in ("법령종류", "법령명", "MST", "index", "sections", "text") if k in item}
+                pos = bisect_right(saved["entries"], entry_order(entry), key=entry_order)
+                saved["entries"].insert(pos, entry)
+                stale = stale or pos < RESULT_PAGE_SIZE
+            if stale and time.monotonic() - drawn >= PREVIEW_INTERVAL:
+                with metrics.stage("render"):
+                    show_preview(preview, saved)
+                stale = False
+                drawn = time.monotonic()
+    except law_processor.LawApiError as e:
+        # 목록을 받지 못한 것을 "찾은 것이 없음"으로 보여 주면 안 된다
+        saved["error"] = str(e)
+    progress.empty()
+    preview.empty()
+
+def start_results(key, message, name, label, run, empty_message=None):
+    """새로 계산해 세션에 넣는다. 법령 종류는 화면에서 고른 것을 쓴다"""
+    collect_results(save_results(key, message, empty_message=empty_message, name=name, label=label,
+                                 run=partial(run, unit=unit), kinds=kinds))
+
+@st.fragment
+def show_results(key):
+    """세션에 둔 결과를 쪽 단위로 보여 준다. 쪽을 넘기거나 법령을 펼치거나 "계속"을 눌러도 이 부분만 다시 그린다.
+
+    검색 결과의 조문 HTML은 펼친 법령 것만 보내므로 결과가 많아도 첫 화면 크기는 쪽 크기로 정해진다.
+    """
+    saved = st.session_state.get(key)
+    if not saved:
+        return
+    entries = saved["entries"]
+    if saved["error"]:
+        st.error(f"법령 목록을 받지 못해 결과를 만들 수 없습니다. 잠시 뒤 다시 시도해주세요. ({saved['error']})")
+        return
+    token = saved["continuation"]
+    if token:
+        # 남은 일은 종류별로 적혀 있다
+        total = sum(part["total"] for part in token["parts"].values())
+        left = sum(len(part["remaining"]) for part in token["parts"].values())
+        # 완료 안내 대신 보여 준다. "계속"으로 끝까지 하면 완료 안내로 바뀐다
+        st.info(f"⏳ 시간 제한으로 {total - left}/{total}개 법령까지 확인했습니다. 지금까지 {len(entries)}개 법령에서 찾은 결과입니다.")
+        if st.button("계속", key=f"{key}_continue_{saved['run_id']}"):
+            collect_results(saved, token)
+            # 위에 이미 그린 안내와 결과를 새로 그린다. 결과는 세션에 있으므로 다시 계산하지 않는다
+            st.rerun()
+    else:
+        st.success(saved["message"].format(found=len(entries)))
+    if saved["failures"]:
+        st.warning(f"{len(saved['failures'])}개 법령의 본문을 불러오지 못했습니다: " + ", ".join(f"{f['법령명']}({f['MST']})" for f in saved["failures"]))
+    metrics = saved["metrics"]
+    if not entries:
+        if saved["empty_message"] and not token:
+            st.markdown(saved["empty_message"], unsafe_allow_html=True)
+        show_timing(metrics)
+        return
+    # 쪽을 넘기거나 법령을 펼칠 때마다 다시 그리므로 그린 횟수와 시간이 render 단계에 쌓인다
+    with metrics.stage("render"):
+        with st.expander(f"📊 요약표 ({len(entries)}개 법령)"):
+            st.dataframe(
+                [{"종류": e.get("법령종류", "법률"), "법령명": e["법령명"], "건수": len(e["sections"]) if "sections" in e else e["text"].count("\n")}
+                 for e in entries],
+                hide_index=True,
+            )
+        pages = -(-len(entries) // RESULT_PAGE_SIZE)
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"쪽 (전체 {pages}쪽, 쪽마다 {RESULT_PAGE_SIZE}개 법령)", min_value=1, max_value=pages,
+                                   value=1, key=f"{key}_page_{saved['run_id']}")
+        start = (page - 1) * RESULT_PAGE_SIZE
+        kind = None
+        for entry in entries[start:start + RESULT_PAGE_SIZE]:
+            # 여러 종류를 함께 찾았으면 종류가 바뀔 때마다 제목을 단다
+            if len(saved["kinds"]) > 1 and entry["법령종류"] != kind:
+                kind = entry["법령종류"]
+                st.markdown(f"#### {kind}")
+            if "text" in entry:
+                st.markdown(entry["text"], unsafe_allow_html=True)
+            elif st.toggle(f"📄 {entry['법령명']} ({len(entry['sections'])}건)", key=f"{key}_open_{saved['run_id']}_{entry['MST']}"):
+                with st.container(border=True):
+                    for html in entry["sections"]:
+                        st.markdown(html, unsafe_allow_html=True)
+    show_timing(metrics)
+
 with st.expander("ℹ️ 사용법 안내"):
     st.markdown(      
              "- 이 앱은 다음 두 가지 기능을 제공합니다:\n"
         "  1. **검색 기능**: 검색어가 포함된 법률 조항을 반환합니다.\n"
-        "     - 단일검색어 기반입니다. \n"
-        "     - 다중검색어 또는 논리연산자(AND, OR, NOT 등)는 지원하지 않습니다. 언젠가 기능이 추가될 수도 있어요. 언젠가는.\n" 
+        "     - 단일검색어 기반입니다. 다중검색어 또는 논리연산자(AND, OR, NOT 등)는 지원하지 않습니다.\n"
+        "     - **로컬 색인 검색**을 켜면 이미 한 번 불러온 법률 안에서 AND, OR, NOT, 괄호, \"구절\" 검색을 할 수 있습니다. 바로 결과가 나오지만 아직 불러온 적 없는 법률은 빠집니다. 서버를 `LAW_INDEX=1`로 띄운 경우에만 보입니다.\n" 
+        "     - 결과는 한 쪽에 20개 법률씩 나옵니다. 법령명 옆 스위치를 켜면 그 법률의 조문이 보이고, **요약표**에서 법률별 건수를 한눈에 볼 수 있습니다.\n"
         "  2. **개정문 생성**: 특정 단어를 다른 단어로 대체하는 부칙 개정문을 자동 생성합니다.\n"
         "     - 21번째 항목부터는 원문자가 아닌 일반숫자로 항목 번호가 표기됩니다. 오류가 아닙니다. 개선예정.\n" 
+        "- **법령 종류**에서 대통령령·총리령·부령을 함께 고르면 종류별로 동시에 찾아 종류별로 나눠 보여 줍니다. 개정문 항목 번호는 종류마다 새로 매깁니다.\n"
+        "- **시간 제한**을 정하면 그 시간이 지났을 때 그때까지 찾은 결과를 먼저 보여 줍니다. **계속**을 누르면 남은 법률만 이어서 확인합니다. 이미 불러온 법률부터 확인하므로 두 번째 검색부터는 빨라집니다.\n"
+        "- **로컬 미러에서 찾기**는 `python app/law_mirror.py sync`로 법률 전체를 받아 둔 경우에만 보이며, 인터넷 연결 없이 미러에서 바로 찾습니다. 마지막 동기화 이후 개정된 법률은 반영되지 않습니다.\n"
         "- 이 앱은 업무망에서는 작동하지 않습니다. 인터넷망에서 사용해주세요. \n"
         "- 속도가 느립니다. 네트워크 속도나 시스템 성능 탓이 아닙니다. 원래 느린 앱이예요. \n"
+        "- 속도 문제를 알려주실 때는 **단계별 시간 보기**를 켜고 나온 표를 같이 보내주세요. \n"
         "- 오류가 있을 수 있습니다. 오류를 발견하시는 분은 사법법제과 김재우(jwkim@assembly.go.kr)로 알려주시면 감사하겠습니다. (캡쳐파일도 같이 주시면 좋아요)"
     )
   
+show_timings = st.checkbox("⏱ 단계별 시간 보기")
+budget = st.number_input("⏳ 시간 제한(초, 0이면 끝까지)", min_value=0, value=0, step=5) or None
+kinds = st.multiselect("법령 종류 (여러 종류를 고르면 동시에 찾습니다)", list(law_processor.LAW_KINDS), default=["법률"]) or ["법률"]
+unit = kinds[0] if len(kinds) == 1 else kinds
+# law_mirror.py sync로 받아 둔 미러가 있을 때만 보인다
+mirror_status = law_processor.get_mirror().status()
+use_mirror = mirror_status["stored"] > 0 and st.checkbox(
+    f"💾 로컬 미러에서 찾기 (법률 {mirror_status['stored']}건, {mirror_status['synced_at'] or '동기화 중'}"
+    + (f", {mirror_status['failed']}건 받지 못함)" if mirror_status["failed"] else ")"))
+
 st.header("🔍 검색 기능")
 search_query = st.text_input("검색어 입력", key="search_query")
+# LAW_INDEX=1로 색인을 켠 경우에만 보인다
+use_index = law_processor.get_default_index() is not None and st.checkbox("로컬 색인 검색 (AND/OR/NOT 지원, 불러온 적 있는 법률만)")
 do_search = st.button("검색 시작")
-if do_search and search_query:
-    with st.spinner("🔍 검색 중..."):
-        result = law_processor.run_search_logic(search_query, unit="법률")
-        st.success(f"{len(result)}개의 법률을 찾았습니다")
-        for law_name, sections in result.items():
-            with st.expander(f"📄 {law_name}"):
-                for html in sections:
-                    st.markdown(html, unsafe_allow_html=True)
+if do_search and search_query and use_index:
+    try:
+        result = law_processor.run_search_logic(search_query, unit="법률", use_index=True)
+    except ValueError as e:
+        st.session_state.pop("search_view", None)
+        st.error(f"검색식 오류: {e}")
+    else:
+        save_results("search_view", "{found}개의 법령을 찾았습니다",
+                     [{"법령명": law_name, "MST": law_name, "sections": sections} for law_name, sections in result.items()])
+elif do_search and search_query:
+    # 검색어 등은 지금 값으로 묶어 두어야 "계속"을 눌렀을 때 입력창이 바뀌었어도 같은 검색을 잇는다
+    start_results(
+        "search_view", "{found}개의 법령을 찾았습니다", "search", "🔍 검색 중...",
+        partial(law_processor.iter_search_results, search_query, use_mirror=use_mirror, budget=budget),
+    )
+show_results("search_view")
 
 st.header("✏️ 타법개정문 생성")
 find_word = st.text_input("찾을 단어")
@@ -47,8 +248,31 @@ replace_word = st.text_input("바꿀 단어")
 do_amend = st.button("개정문 생성")
 
 if do_amend and find_word and replace_word:
-    with st.spinner("🛠 개정문 생성 중..."):
-        result = run_amendment_logic(find_word, replace_word)
-        st.success("개정문 생성 완료")
-        for amend in result:
-            st.markdown(amend, unsafe_allow_html=True)
+    start_results(
+        "amend_view", "개정문 생성 완료", "amendment", "🛠 개정문 생성 중...",
+        partial(law_processor.iter_amendments, find_word, replace_word, use_mirror=use_mirror, budget=budget),
+        "⚠️ 개정 대상 조문이 없습니다.",
+    )
+show_results("amend_view")
+
+st.subheader("📑 여러 단어 한꺼번에 개정")
+pair_rows = st.data_editor(
+    [{"찾을 단어": "", "바꿀 단어": ""}],
+    num_rows="dynamic",
+    key="batch_pairs",
+)
+do_batch = st.button("일괄 개정문 생성")
+
+if do_batch:
+    pairs = [(row["찾을 단어"].strip(), row["바꿀 단어"].strip()) for row in pair_rows if row.get("찾을 단어") and row.get("바꿀 단어")]
+    if not pairs:
+        st.session_state.pop("batch_view", None)
+        st.warning("찾을 단어와 바꿀 단어를 한 줄 이상 입력해주세요.")
+    else:
+        # 모든 단어 쌍을 법령마다 한 번에 처리해 하나의 개정 문단으로 합친다
+        start_results(
+            "batch_view", f"{len(pairs)}개 단어 쌍의 개정문 생성 완료", "batch_amendment", "🛠 일괄 개정문 생성 중...",
+            partial(law_processor.iter_batch_amendments, pairs, use_mirror=use_mirror, budget=budget),
+            "⚠️ 개정 대상 조문이 없습니다.",
+        )
+show_results("batch_view")
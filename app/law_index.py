@@ -0,0 +1,449 @@
+import os
+import pickle
+import queue
+import re
+import tempfile
+import threading
+import zlib
+from array import array
+from contextlib import contextmanager
+
+# 이미 받아 둔 법령 본문으로 만드는 로컬 역색인.
+# 법령 문장에는 믿을 만한 단어 경계가 없으므로 공백을 없앤 본문의 글자 2-gram을 색인어로 쓰고,
+# 게시 목록은 조문·항·호·목 단위의 위치(unit)를 가리킨다. 후보를 n-gram으로 좁힌 뒤 실제 포함 여부를 확인한다.
+# 디스크에는 법령(MST)마다 한 파일씩 두어, 새로 색인한 법령만 쓰고 빠진 판본은 그 파일만 지운다.
+DEFAULT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".law_cache", "index"))
+INDEX_DIR = os.getenv("LAW_INDEX_DIR", DEFAULT_DIR)
+# 색인은 검색과 같은 CPU를 쓰므로 LAW_INDEX=1로 켠 경우에만 만든다
+INDEX_ENABLED = os.getenv("LAW_INDEX", "0") == "1"
+# 색인을 기다리는 법령 수. 넘치면 버리고 그 법령을 다음에 다시 읽을 때 색인한다
+INDEX_QUEUE_SIZE = int(os.getenv("LAW_INDEX_QUEUE", "64"))
+NGRAM = 2
+FORMAT_VERSION = 2
+
+_SPACE_RE = re.compile(r"\s+")
+_QUERY_TOKEN_RE = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+OPERATORS = {"AND", "OR", "NOT"}
+
+
+class QuerySyntaxError(ValueError):
+    """검색식을 해석할 수 없는 경우"""
+
+
+def _grams(text):
+    if len(text) < NGRAM:
+        return set()
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def parse_query(query):
+    """AND/OR/NOT, 괄호, 큰따옴표 구절을 지원하는 검색식을 트리로 바꾼다.
+
+    연산자 없이 나란히 쓴 검색어는 AND로 묶는다. 결과는 ("term", 검색어), ("not", x),
+    ("and", [x, ...]), ("or", [x, ...]) 형태의 튜플이다. 검색어의 공백은 무시한다.
+    """
+    tokens = _QUERY_TOKEN_RE.findall(query or "")
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or():
+        nodes = [parse_and()]
+        while peek() == "OR":
+            take()
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and():
+        nodes = [parse_not()]
+        while peek() is not None and peek() not in ("OR", ")"):
+            if peek() == "AND":
+                take()
+            nodes.append(parse_not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_not():
+        if peek() == "NOT":
+            take()
+            return ("not", parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        token = peek()
+        if token is None or token in OPERATORS or token == ")":
+            raise QuerySyntaxError(f"검색어가 와야 할 자리입니다: {token or '(끝)'}")
+        take()
+        if token == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise QuerySyntaxError("괄호가 닫히지 않았습니다")
+            take()
+            return node
+        term = _SPACE_RE.sub("", token.strip('"'))
+        if not term:
+            raise QuerySyntaxError("빈 검색어입니다")
+        return ("term", term)
+
+    if not tokens:
+        raise QuerySyntaxError("검색식이 비어 있습니다")
+    tree = parse_or()
+    if pos != len(tokens):
+        raise QuerySyntaxError(f"해석할 수 없는 부분이 있습니다: {' '.join(tokens[pos:])}")
+    return tree
+
+
+def positive_terms(tree):
+    """하이라이트할 검색어(NOT 아래에 있지 않은 것) 목록"""
+    kind, value = tree
+    if kind == "term":
+        return [value]
+    if kind == "not":
+        return []
+    return [term for node in value for term in positive_terms(node)]
+
+
+def _build_segment(name, doc):
+    """법령 하나의 색인 조각. unit 번호와 조문 번호는 그 법령 안에서 0부터 매긴다"""
+    units = []
+    postings = {}
+
+    def add(article_no, location, text):
+        text_clean = _SPACE_RE.sub("", text or "")
+        if not text_clean:
+            return
+        unit_id = len(units)
+        units.append((article_no, location, text, text_clean))
+        for gram in _grams(text_clean):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("I")
+            posting.append(unit_id)
+
+    for article_no, article in enumerate(doc.articles):
+        add(article_no, article.label, article.text)
+        for 항 in article.paragraphs:
+            add(article_no, 항.location, 항.text)
+            for 호 in 항.items:
+                add(article_no, 호.location, 호.text)
+                for 목 in 호.sub_items:
+                    add(article_no, 목.location, 목.text)
+    return {"version": FORMAT_VERSION, "ngram": NGRAM, "name": name, "units": units, "postings": postings}
+
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class LawIndex:
+    """MST 단위로 더하고 뺄 수 있는 n-gram 역색인.
+
+    unit은 (MST, 조문 번호, 위치, 원문, 공백 없는 본문) 튜플이고 지워진 unit은 None으로 남는다.
+    한 법령과 한 조문의 unit은 연속해 있으므로 laws와 articles에는 unit 번호 구간만 둔다.
+    postings는 n-gram → unit 번호 array('I')이며 unit 번호가 늘어나는 순서로 쌓인다.
+    """
+
+    def __init__(self):
+        self.laws = {}
+        self.articles = {}
+        self.units = []
+        self.postings = {}
+        self.next_article = 0
+        self.dead = 0
+        # 아직 디스크에 쓰지 않은 조각(MST → 조각)과 디스크에서 지울 MST
+        self._unsaved = {}
+        self._removed = set()
+        self._lock = threading.RLock()
+
+    @property
+    def dirty(self):
+        return bool(self._unsaved or self._removed)
+
+    def __contains__(self, mst):
+        return str(mst) in self.laws
+
+    def __len__(self):
+        return len(self.laws)
+
+    def add_law(self, mst, name, doc):
+        """파싱된 법령(LawDocument)을 색인한다. 같은 이름의 예전 판본은 빼낸다."""
+        mst = str(mst)
+        segment = _build_segment(name, doc)
+        with self._lock:
+            for old_mst, (old_name, _, _) in list(self.laws.items()):
+                if old_mst == mst or old_name == name:
+                    self._remove(old_mst)
+            self._merge(mst, segment)
+            self._unsaved[mst] = segment
+            self._removed.discard(mst)
+
+    def _merge(self, mst, segment):
+        """조각의 unit을 뒤에 붙이고 게시 목록을 번호를 밀어 이어 붙인다"""
+        start = len(self.units)
+        article_ids = {}
+        for article_no, location, text, text_clean in segment["units"]:
+            unit_id = len(self.units)
+            article_id = article_ids.get(article_no)
+            if article_id is None:
+                article_id = article_ids[article_no] = self.next_article
+                self.next_article += 1
+                self.articles[article_id] = (unit_id, unit_id + 1)
+            else:
+                self.articles[article_id] = (self.articles[article_id][0], unit_id + 1)
+            self.units.append((mst, article_id, location, text, text_clean))
+        for gram, local in segment["postings"].items():
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            posting.extend(start + unit_id for unit_id in local)
+        self.laws[mst] = (segment["name"], start, len(self.units))
+
+    def _add_unit(self, mst, article_id, location, text):
+        text_clean = _SPACE_RE.sub("", text or "")
+        if not text_clean:
+            return
+        unit_id = len(self.units)
+        self.units.append((mst, article_id, location, text, text_clean))
+        for gram in _grams(text_clean):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            posting.append(unit_id)
+
+    def remove_law(self, mst):
+        with self._lock:
+            self._remove(str(mst))
+
+    def _remove(self, mst):
+        entry = self.laws.pop(mst, None)
+        if entry is None:
+            return
+        _, start, end = entry
+        for unit_id in range(start, end):
+            self.articles.pop(self.units[unit_id][1], None)
+            self.units[unit_id] = None
+        self.dead += end - start
+        self._unsaved.pop(mst, None)
+        self._removed.add(mst)
+        # 지워진 unit이 많아지면 번호를 다시 매겨 게시 목록을 줄인다
+        if self.dead > len(self.units) // 4:
+            self._compact()
+
+    def _compact(self):
+        laws, units = self.laws, self.units
+        self.laws, self.articles, self.units, self.postings, self.dead = {}, {}, [], {}, 0
+        for mst, (name, start, end) in laws.items():
+            law_start = len(self.units)
+            for unit in units[start:end]:
+                unit_id = len(self.units)
+                self._add_unit(*unit[:4])
+                article_start, _ = self.articles.get(unit[1], (unit_id, None))
+                self.articles[unit[1]] = (article_start, unit_id + 1)
+            self.laws[mst] = (name, law_start, len(self.units))
+
+    def _match_term(self, term):
+        """검색어가 들어 있는 unit 번호 집합"""
+        grams = _grams(term)
+        if grams:
+            postings = sorted((self.postings.get(g, ()) for g in grams), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+        else:
+            candidates = range(len(self.units))
+        return {u for u in candidates if self.units[u] is not None and term in self.units[u][4]}
+
+    def _evaluate(self, node, all_articles):
+        kind, value = node
+        if kind == "term":
+            return {self.units[u][1] for u in self._match_term(value)}
+        if kind == "not":
+            return all_articles - self._evaluate(value, all_articles)
+        sets = [self._evaluate(child, all_articles) for child in value]
+        if kind == "and":
+            return set.intersection(*sets)
+        return set.union(*sets)
+
+    def search(self, query):
+        """검색식에 맞는 조문을 찾는다.
+
+        AND/OR/NOT은 조문(조문단위) 단위로 판단한다. 결과는 법령명 순으로
+        (MST, 법령명, [[(위치, 원문), ...] 조문별 목록]) 튜플의 리스트다.
+        """
+        tree = parse_query(query)
+        terms = positive_terms(tree)
+        with self._lock:
+            articles = self._evaluate(tree, self.articles.keys())
+            by_law = {}
+            for article_id in sorted(articles):
+                start, end = self.articles[article_id]
+                hits = []
+                for unit in self.units[start:end]:
+                    # 조문 본문은 항상 앞에 두고, 그 아래는 검색어가 들어 있는 곳만 보여준다
+                    if not hits or any(term in unit[4] for term in terms):
+                        hits.append((unit[2], unit[3]))
+                by_law.setdefault(self.units[start][0], []).append(hits)
+            results = [(mst, self.laws[mst][0], hits) for mst, hits in by_law.items()]
+        results.sort(key=lambda r: r[1])
+        return results
+
+    def save(self, directory=INDEX_DIR):
+        """새로 색인한 법령만 MST별 파일로 쓰고, 빠진 판본의 파일은 지운다"""
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+            removed, self._removed = self._removed, set()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for mst, segment in unsaved.items():
+                # 저장은 법령을 색인할 때마다 하므로 압축률보다 속도를 고른다
+                _write_atomic(os.path.join(directory, f"{mst}.seg"),
+                              zlib.compress(pickle.dumps(segment, protocol=pickle.HIGHEST_PROTOCOL), 1))
+            for mst in removed - set(unsaved):
+                try:
+                    os.remove(os.path.join(directory, f"{mst}.seg"))
+                except FileNotFoundError:
+                    pass
+        except BaseException:
+            # 쓰지 못한 것은 다음 저장 때 다시 쓴다
+            with self._lock:
+                for mst, segment in unsaved.items():
+                    if mst in self.laws:
+                        self._unsaved.setdefault(mst, segment)
+                self._removed |= {mst for mst in removed if mst not in self.laws}
+            raise
+
+    @classmethod
+    def load(cls, directory=INDEX_DIR):
+        """저장된 조각을 모두 읽어 붙인다. 읽을 수 없거나 형식이 다른 조각은 건너뛴다"""
+        index = cls()
+        try:
+            names = [name for name in os.listdir(directory) if name.endswith(".seg")]
+        except OSError:
+            return index
+        # 같은 이름의 판본이 여럿 남아 있으면 MST가 큰(나중) 것을 남기고 나머지는 다음 저장 때 지운다
+        for name in sorted(names, key=lambda name: (len(name), name)):
+            try:
+                with open(os.path.join(directory, name), "rb") as f:
+                    segment = pickle.loads(zlib.decompress(f.read()))
+            except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+                continue
+            if segment.get("version") != FORMAT_VERSION or segment.get("ngram") != NGRAM:
+                continue
+            with index._lock:
+                for old_mst, (old_name, _, _) in list(index.laws.items()):
+                    if old_name == segment["name"]:
+                        index._remove(old_mst)
+                index._merge(name[:-len(".seg")], segment)
+        return index
+
+
+class BackgroundIndexer:
+    """파싱된 법령을 검색 요청 밖의 스레드 하나에서 색인하고, 밀린 일이 없을 때마다 저장한다.
+
+    색인도 CPU를 쓰므로 hold()로 잡혀 있는 동안(검색이 도는 동안)에는 기다렸다가 한가할 때 한다.
+    """
+
+    def __init__(self, index, directory=INDEX_DIR, max_pending=INDEX_QUEUE_SIZE):
+        self.index = index
+        self.directory = directory
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._holds = 0
+        self._idle = threading.Condition()
+        threading.Thread(target=self._run, name="law-index", daemon=True).start()
+
+    def submit(self, mst, name, doc):
+        """색인에 없는 법령이면 색인을 맡긴다. 기다리지 않는다"""
+        mst = str(mst)
+        with self._lock:
+            if mst in self.index or mst in self._pending:
+                return
+            self._pending.add(mst)
+        try:
+            self._queue.put_nowait((mst, name, doc))
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(mst)
+                self.dropped += 1
+
+    @contextmanager
+    def hold(self):
+        """이 안에 있는 동안에는 색인을 미룬다"""
+        with self._idle:
+            self._holds += 1
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._holds -= 1
+                self._idle.notify_all()
+
+    def _run(self):
+        while True:
+            mst, name, doc = self._queue.get()
+            with self._idle:
+                while self._holds:
+                    self._idle.wait()
+            try:
+                self.index.add_law(mst, name, doc)
+                if self._queue.empty():
+                    self.index.save(self.directory)
+            except OSError:
+                pass
+            finally:
+                with self._lock:
+                    self._pending.discard(mst)
+                self._queue.task_done()
+
+    def flush(self):
+        """맡긴 색인을 모두 마치고 저장한다. hold() 안에서 부르면 끝나지 않는다"""
+        self._queue.join()
+        if self.index.dirty:
+            self.index.save(self.directory)
+
+
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_default_index():
+    """프로세스 공용 색인. LAW_INDEX=1로 켜지 않았으면 None"""
+    global _default_index
+    if not INDEX_ENABLED:
+        return None
+    with _default_lock:
+        if _default_index is None:
+            _default_index = LawIndex.load()
+        return _default_index
+
+
+_default_indexer = None
+
+
+def get_default_indexer():
+    """공용 색인에 법령을 더하는 백그라운드 작업자. 색인을 켜지 않았으면 None"""
+    global _default_indexer
+    index = get_default_index()
+    if index is None:
+        return None
+    with _default_lock:
+        if _default_indexer is None:
+            _default_indexer = BackgroundIndexer(index)
+        return _default_indexer
@@ -0,0 +1,95 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """여러 단어를 한 번에 찾는 Aho-Corasick 자동자.
+
+    개정문 생성에서는 `[가-힣A-Za-z0-9]+` 토큰마다 한 번씩 돌려 그 토큰에 든 찾을 단어를 모두 얻는다.
+    """
+
+    def __init__(self, words):
+        self.words = list(dict.fromkeys(w for w in words if w))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for word in self.words:
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = self._out[state] + (word,)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def contains_any(self, text):
+        """text에 단어가 하나라도 들어 있는지"""
+        if len(self.words) == 1:
+            return self.words[0] in text
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                return True
+        return False
+
+    def find(self, text):
+        """text에 들어 있는 단어를 처음 나온 순서대로 중복 없이 돌려준다"""
+        if len(self.words) == 1:
+            # 단어가 하나뿐이면 문자열 검색이 훨씬 빠르다
+            return self.words if self.words[0] in text else []
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        found = []
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for word in out[state]:
+                if word not in found:
+                    found.append(word)
+        return found
+
+    def find_longest(self, text):
+        """겹치는 단어 중 먼저 시작하는(같으면 더 긴) 것만 남겨 (시작 위치, 단어)를 왼쪽부터 돌려준다"""
+        if len(self.words) == 1:
+            word = self.words[0]
+            spans = []
+            start = text.find(word)
+            while start >= 0:
+                spans.append((start, word))
+                start = text.find(word, start + len(word))
+            return spans
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        matches = []
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for word in out[state]:
+                matches.append((end - len(word), -len(word), word))
+        matches.sort()
+        spans = []
+        covered = 0
+        for start, negative_length, word in matches:
+            if start >= covered:
+                spans.append((start, word))
+                covered = start - negative_length
+        return spans
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import threading
+import time
+
+# 검색·개정문 한 번의 실행에서 단계별 시간(목록 조회, 본문 받기, 파싱, 매칭, 화면 출력)과
+# 법령별 받기 시간·크기, 처리한 법령·조문·토큰 수를 모은다.
+# 꺼져 있을 때는 NULL_METRICS가 모든 호출을 그냥 흘려보내므로 비용이 거의 없다.
+METRICS_ENABLED = os.getenv("LAW_METRICS", "0") == "1"
+
+logger = logging.getLogger("law_metrics")
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Metrics:
+    """한 번의 실행에 대한 측정값"""
+
+    enabled = True
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.finished = None
+        self.stages = {}
+        self.counters = {}
+        self.fetches = []
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """with metrics.stage("parse"): ... 로 구간 시간을 더한다"""
+        return _Stage(self, name)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            total, calls = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (total + seconds, calls + 1)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def fetch(self, mst, seconds, size, cached=False):
+        """법령 본문 하나를 받는 데 걸린 시간과 크기"""
+        with self._lock:
+            self.fetches.append({"MST": mst, "seconds": seconds, "bytes": size, "cached": cached})
+
+    def summary(self):
+        with self._lock:
+            fetches = list(self.fetches)
+            return {
+                "run": self.name,
+                "wall_seconds": (self.finished or time.perf_counter()) - self.started,
+                "stages": {name: {"seconds": total, "calls": calls} for name, (total, calls) in self.stages.items()},
+                "counters": dict(self.counters),
+                "fetch": {
+                    "count": len(fetches),
+                    "cached": sum(1 for f in fetches if f["cached"]),
+                    "bytes": sum(f["bytes"] for f in fetches),
+                    "seconds": sum(f["seconds"] for f in fetches),
+                    "slowest": sorted(fetches, key=lambda f: f["seconds"], reverse=True)[:10],
+                },
+            }
+
+    def finish(self):
+        """측정을 마치고 구조화된 로그로 남긴 뒤 프로세스 누적값에 더한다.
+
+        전체 시간은 여기서 멈춘다. 그 뒤에 더하는 구간(앱의 화면 출력 등)은 단계별 시간에만 들어간다.
+        """
+        if self.finished is None:
+            self.finished = time.perf_counter()
+        summary = self.summary()
+        logger.info(json.dumps(summary, ensure_ascii=False))
+        REGISTRY.merge(summary)
+        return summary
+
+
+class _NullMetrics:
+    """측정을 끈 경우. 모든 메서드가 아무 일도 하지 않는다"""
+
+    enabled = False
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def add_time(self, name, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def fetch(self, mst, seconds, size, cached=False):
+        pass
+
+    def summary(self):
+        return {}
+
+    def finish(self):
+        return {}
+
+
+NULL_METRICS = _NullMetrics()
+
+
+def new_metrics(name, enabled=None):
+    """enabled를 주지 않으면 LAW_METRICS 환경변수를 따른다"""
+    if enabled is None:
+        enabled = METRICS_ENABLED
+    return Metrics(name) if enabled else NULL_METRICS
+
+
+class Registry:
+    """프로세스가 떠 있는 동안의 누적값. Prometheus 텍스트 형식으로 내보낸다"""
+
+    def __init__(self):
+        self.runs = {}
+        self.stage_seconds = {}
+        self.stage_calls = {}
+        self.counters = {}
+        self.fetch_bytes = 0
+        self.fetch_count = 0
+        self.fetch_cached = 0
+        self._lock = threading.Lock()
+
+    def merge(self, summary):
+        with self._lock:
+            run = summary["run"]
+            self.runs[run] = self.runs.get(run, 0) + 1
+            for name, stage in summary["stages"].items():
+                key = (run, name)
+                self.stage_seconds[key] = self.stage_seconds.get(key, 0.0) + stage["seconds"]
+                self.stage_calls[key] = self.stage_calls.get(key, 0) + stage["calls"]
+            for name, n in summary["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            self.fetch_bytes += summary["fetch"]["bytes"]
+            self.fetch_count += summary["fetch"]["count"]
+            self.fetch_cached += summary["fetch"]["cached"]
+
+    def prometheus(self, latency_stats=None):
+        """Prometheus 텍스트 형식. latency_stats는 LawClient.latency_stats()의 결과"""
+        lines = []
+        with self._lock:
+            lines.append("# TYPE law_runs_total counter")
+            for run, n in sorted(self.runs.items()):
+                lines.append(f'law_runs_total{{run="{run}"}} {n}')
+            lines.append("# TYPE law_stage_seconds_total counter")
+            for (run, stage), seconds in sorted(self.stage_seconds.items()):
+                lines.append(f'law_stage_seconds_total{{run="{run}",stage="{stage}"}} {seconds:.6f}')
+            lines.append("# TYPE law_stage_calls_total counter")
+            for (run, stage), calls in sorted(self.stage_calls.items()):
+                lines.append(f'law_stage_calls_total{{run="{run}",stage="{stage}"}} {calls}')
+            lines.append("# TYPE law_items_total counter")
+            for name, n in sorted(self.counters.items()):
+                lines.append(f'law_items_total{{kind="{name}"}} {n}')
+            lines.append("# TYPE law_fetch_total counter")
+            lines.append(f"law_fetch_total {self.fetch_count}")
+            lines.append("# TYPE law_fetch_cached_total counter")
+            lines.append(f"law_fetch_cached_total {self.fetch_cached}")
+            lines.append("# TYPE law_fetch_bytes_total counter")
+            lines.append(f"law_fetch_bytes_total {self.fetch_bytes}")
+        if latency_stats:
+            lines.append("# TYPE law_http_latency_seconds histogram")
+        for endpoint, hist in sorted((latency_stats or {}).items()):
+            cumulative = 0
+            for bound, n in zip(hist["buckets"], hist["counts"]):
+                cumulative += n
+                lines.append(f'law_http_latency_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'law_http_latency_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {hist["count"]}')
+            lines.append(f'law_http_latency_seconds_sum{{endpoint="{endpoint}"}} {hist["sum"]:.6f}')
+            lines.append(f'law_http_latency_seconds_count{{endpoint="{endpoint}"}} {hist["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
@@ -0,0 +1,307 @@
+"""법률(knd=A0002) 전체 본문의 로컬 미러.
+
+lawSearch.do로 현행 법률 목록을 모두 받아 미러와 MST로 비교하고, 새로 나왔거나 바뀐 판본만
+lawService.do로 받는다. 목록에서 빠진(새 판본으로 대체된) MST는 받기가 모두 끝난 뒤 지운다.
+새 판본을 받지 못한 법률은 이전 판본을 남겨 두고, 거듭 실패하는 판본은 건너뛴다.
+본문 하나를 받을 때마다 기록하므로 중간에 끊겨도 다시 돌리면 남은 것만 받는다.
+
+    python app/law_mirror.py sync
+    python app/law_mirror.py sync --retry-failed
+    python app/law_mirror.py status
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from law_client import LawApiError, get_client
+from law_match import AhoCorasick
+from law_model import raw_text_clean
+
+DEFAULT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".law_mirror"))
+MIRROR_DIR = os.getenv("LAW_MIRROR_DIR", DEFAULT_DIR)
+MIRROR_KND = "A0002"
+LIST_PAGE_SIZE = 100
+SYNC_WORKERS = int(os.getenv("LAW_MIRROR_WORKERS", "8"))
+# 본문 받기가 이만큼 실패한 판본은 sync --retry-failed로 다시 시도하기 전까지 건너뛴다
+MAX_FAILURES = int(os.getenv("LAW_MIRROR_MAX_FAILURES", "3"))
+
+# 찾을 단어가 이보다 많으면 단어마다 본문을 훑기보다 Aho-Corasick으로 한 번 훑는 편이 빠르다
+AUTOMATON_MIN_WORDS = 128
+
+# XML에서 이스케이프되는 글자가 든 단어는 원문 bytes에서 바로 찾을 수 없다
+_XML_ESCAPED = set('&<>"\'')
+
+
+class MirrorSyncError(Exception):
+    """목록을 끝까지 받지 못해 동기화를 마칠 수 없는 경우"""
+
+
+class LawMirror:
+    """MST → 법률 본문 XML 로컬 미러.
+
+    목록(법령명, 목록 순서)과 본문 보유 여부는 sqlite에, 본문은 texts/<MST>.xml.z에
+    zlib으로 압축해 둔다. 파일은 원자적으로 바꿔 쓰므로 동기화 중에도 읽을 수 있다.
+    본문 검색(find)용으로 공백을 없앤 본문은 압축하지 않고 sqlite clean 테이블에 따로 둔다.
+    """
+
+    def __init__(self, directory=MIRROR_DIR):
+        self.directory = directory
+        self.texts_dir = os.path.join(directory, "texts")
+        os.makedirs(self.texts_dir, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS laws ("
+                "mst TEXT PRIMARY KEY, name TEXT NOT NULL, rank INTEGER NOT NULL, "
+                "stored INTEGER NOT NULL DEFAULT 0, listed INTEGER NOT NULL DEFAULT 1)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS clean (mst TEXT PRIMARY KEY, text TEXT NOT NULL)")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(laws)")}
+            if "failures" not in columns:
+                conn.execute("ALTER TABLE laws ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+        self._backfilled = False
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, "mirror.sqlite"), timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _text_path(self, mst):
+        return os.path.join(self.texts_dir, f"{mst}.xml.z")
+
+    def _write_text(self, mst, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.texts_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp_path, self._text_path(mst))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def laws(self):
+        """본문을 가진 법률 목록(목록 순서). 항목은 법령명, MST dict
+
+        동기화 중에는 새 판본을 받기 전까지 같은 이름의 이전 판본을 대신 돌려준다.
+        """
+        rows = self._connect().execute(
+            "SELECT mst, name, rank FROM laws WHERE stored = 1 ORDER BY listed DESC, rank").fetchall()
+        seen = set()
+        laws = []
+        for mst, name, rank in rows:
+            if name not in seen:
+                seen.add(name)
+                laws.append((rank, {"법령명": name, "MST": mst}))
+        laws.sort(key=lambda x: x[0])
+        return [law for _, law in laws]
+
+    def load(self, mst):
+        """(본문, True). 미러에 없으면 FileNotFoundError"""
+        with open(self._text_path(mst), "rb") as f:
+            return zlib.decompress(f.read()), True
+
+    def find(self, words):
+        """본문(공백 무시)에 단어가 하나라도 든 법률 목록. lawSearch.do의 본문 검색(search=2)에 해당한다"""
+        found = self.find_each(words)
+        msts = set().union(*({law["MST"] for law in laws} for laws in found.values()))
+        return [law for law in self.laws() if law["MST"] in msts]
+
+    def find_each(self, words):
+        """단어 → 본문(공백 무시)에 그 단어가 든 법률 목록. 단어가 많아도 미러는 한 번만 훑는다"""
+        laws = self.laws()
+        cleaned = {word: raw_text_clean(word.encode("utf-8")) for word in words}
+        # 빈 단어나 원문에서 바로 찾을 수 없는 단어는 모든 법률을 후보로 돌려준다
+        wanted = {w for w in cleaned.values() if w and not _XML_ESCAPED & set(w)}
+        hits = {w: set() for w in wanted}
+        if wanted:
+            self._backfill_clean()
+            matcher = AhoCorasick(wanted) if len(wanted) >= AUTOMATON_MIN_WORDS else None
+            for mst, text in self._connect().execute("SELECT mst, text FROM clean"):
+                for w in (matcher.find(text) if matcher is not None else [w for w in wanted if w in text]):
+                    hits[w].add(mst)
+        return {word: [law for law in laws if law["MST"] in hits[w]] if w in hits else laws
+                for word, w in cleaned.items()}
+
+    def _backfill_clean(self):
+        """검색용 본문이 없는 법률(이전 형식의 미러)에 채워 넣는다"""
+        if self._backfilled:
+            return
+        conn = self._connect()
+        missing = [mst for (mst,) in conn.execute(
+            "SELECT mst FROM laws WHERE stored = 1 AND mst NOT IN (SELECT mst FROM clean)")]
+        for mst in missing:
+            try:
+                text = raw_text_clean(self.load(mst)[0])
+            except (OSError, zlib.error):
+                continue
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO clean (mst, text) VALUES (?, ?)", (mst, text))
+        self._backfilled = True
+
+    def status(self):
+        """목록 법률 수, 본문을 가진 수, 받기를 거듭 실패해 건너뛰는 수, 마지막 동기화 시각"""
+        conn = self._connect()
+        total, stored, failed = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(stored), 0), COALESCE(SUM(stored = 0 AND failures >= ?), 0) "
+            "FROM laws WHERE listed = 1", (MAX_FAILURES,)).fetchone()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'synced_at'").fetchone()
+        return {"laws": total, "stored": stored, "failed": failed, "synced_at": row[0] if row else None}
+
+    def _fetch_listing(self, max_workers):
+        """현행 법률 전체 목록. 한 페이지라도 못 받으면 MirrorSyncError"""
+        client = get_client()
+
+        def page(no):
+            try:
+                body = client.get("lawSearch", target="law", type="XML", display=LIST_PAGE_SIZE,
+                                  page=no, knd=MIRROR_KND)
+            except LawApiError as e:
+                raise MirrorSyncError(f"목록 {no}쪽을 받지 못했습니다: {e}") from e
+            root = ET.fromstring(body)
+            total = root.findtext("totalCnt", "").strip()
+            rows = [(law.findtext("법령일련번호", ""), law.findtext("법령명한글", "").strip())
+                    for law in root.findall("law")]
+            return (int(total) if total.isdigit() else None), rows
+
+        total, rows = page(1)
+        if total is None:
+            raise MirrorSyncError("목록에 totalCnt가 없습니다")
+        last_page = -(-total // LIST_PAGE_SIZE)
+        if last_page > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, last_page - 1)) as pool:
+                for _, page_rows in pool.map(page, range(2, last_page + 1)):
+                    rows.extend(page_rows)
+        listing = {}
+        for mst, name in rows:
+            if mst and mst not in listing:
+                listing[mst] = name
+        if len(listing) < total:
+            # 받는 사이 목록이 바뀌었을 수 있다. 빠진 법률을 지우면 안 되므로 여기서 멈춘다
+            raise MirrorSyncError(f"목록이 {total}건인데 {len(listing)}건만 받았습니다")
+        return listing
+
+    def sync(self, max_workers=SYNC_WORKERS, progress=None, retry_failed=False):
+        """목록과 비교해 새 판본을 받고 대체된 판본을 지운다. progress(done, total)를 부른다.
+
+        본문 받기에 실패한 판본은 실패 횟수를 세어 두고 다음 동기화에서 다시 받는다. MAX_FAILURES번
+        실패한 판본은 retry_failed=True로 부를 때까지 건너뛴다. 새 판본을 아직 받지 못한 법률은 이전
+        판본을 남겨 두고, 나머지 대체된 판본은 실패와 상관없이 지운다.
+        결과는 added, downloaded, failed, skipped(건너뛴 판본), removed 건수 dict다.
+        """
+        listing = self._fetch_listing(max_workers)
+        conn = self._connect()
+        known = {mst for (mst,) in conn.execute("SELECT mst FROM laws")}
+        if retry_failed:
+            with conn:
+                conn.execute("UPDATE laws SET failures = 0")
+        with conn:
+            # 목록에 없는 판본은 listed=0으로 표시해 두고 받기가 모두 끝난 뒤 지운다
+            conn.execute("UPDATE laws SET listed = 0")
+            conn.executemany(
+                "INSERT INTO laws (mst, name, rank, stored, listed) VALUES (?, ?, ?, 0, 1) "
+                "ON CONFLICT(mst) DO UPDATE SET name = excluded.name, rank = excluded.rank, listed = 1",
+                [(mst, name, rank) for rank, (mst, name) in enumerate(listing.items())],
+            )
+        pending = [mst for (mst,) in conn.execute(
+            "SELECT mst FROM laws WHERE listed = 1 AND stored = 0 AND failures < ?", (MAX_FAILURES,))]
+        client = get_client()
+
+        def download(mst):
+            data = client.get("lawService", target="law", MST=mst, type="XML")
+            self._write_text(mst, data)
+            return mst, raw_text_clean(data)
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(download, mst): mst for mst in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    mst, text = future.result()
+                except (LawApiError, OSError):
+                    failed += 1
+                    with conn:
+                        conn.execute("UPDATE laws SET failures = failures + 1 WHERE mst = ?", (futures[future],))
+                else:
+                    with conn:
+                        conn.execute("INSERT OR REPLACE INTO clean (mst, text) VALUES (?, ?)", (mst, text))
+                        conn.execute("UPDATE laws SET stored = 1 WHERE mst = ?", (mst,))
+                if progress is not None:
+                    progress(done, len(pending))
+        removed = self._collect_garbage()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_at', ?)",
+                         (time.strftime("%Y-%m-%dT%H:%M:%S%z"),))
+        skipped = conn.execute("SELECT COUNT(*) FROM laws WHERE listed = 1 AND stored = 0 AND failures >= ?",
+                               (MAX_FAILURES,)).fetchone()[0]
+        return {"added": len(set(listing) - known), "downloaded": len(pending) - failed,
+                "failed": failed, "skipped": skipped, "removed": removed}
+
+    def _collect_garbage(self):
+        """목록에서 빠진 판본과 색인에 없는 파일을 지운다. 새 판본을 아직 못 받은 법률의 이전 판본은 남긴다"""
+        conn = self._connect()
+        with conn:
+            stale = [mst for (mst,) in conn.execute(
+                "SELECT mst FROM laws WHERE listed = 0 AND name NOT IN "
+                "(SELECT name FROM laws WHERE listed = 1 AND stored = 0)")]
+            conn.executemany("DELETE FROM laws WHERE mst = ?", [(mst,) for mst in stale])
+            conn.execute("DELETE FROM clean WHERE mst NOT IN (SELECT mst FROM laws WHERE stored = 1)")
+        keep = {f"{mst}.xml.z" for (mst,) in conn.execute("SELECT mst FROM laws WHERE stored = 1")}
+        for name in os.listdir(self.texts_dir):
+            if name not in keep:
+                try:
+                    os.remove(os.path.join(self.texts_dir, name))
+                except OSError:
+                    pass
+        return len(stale)
+
+
+_default_mirror = None
+_default_lock = threading.Lock()
+
+
+def get_mirror():
+    """프로세스 공용 미러(LAW_MIRROR_DIR)"""
+    global _default_mirror
+    with _default_lock:
+        if _default_mirror is None:
+            _default_mirror = LawMirror()
+        return _default_mirror
+
+
+def main():
+    parser = argparse.ArgumentParser(description="법률 전체 본문의 로컬 미러")
+    parser.add_argument("command", choices=["sync", "status"])
+    parser.add_argument("--workers", type=int, default=SYNC_WORKERS)
+    parser.add_argument("--retry-failed", action="store_true", help=f"{MAX_FAILURES}번 실패해 건너뛰던 판본도 다시 받는다")
+    args = parser.parse_args()
+    mirror = get_mirror()
+    if args.command == "status":
+        print(mirror.status())
+        return
+    started = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+    try:
+        result = mirror.sync(args.workers, progress, args.retry_failed)
+    except MirrorSyncError as e:
+        sys.exit(f"동기화 실패: {e}")
+    print(file=sys.stderr)
+    print(f"{result} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import io
+import os
+import re
+import threading
+import unicodedata
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+# lawService XML(조문단위 → 항 → 호 → 목)을 한 번만 읽어 검색과 개정문 생성이 함께 쓰는 가벼운 모델로 바꾼다.
+# 공백을 없앤 본문, 위치 문자열, 토큰 목록을 미리 만들어 두므로 질의마다 트리를 다시 훑지 않아도 된다.
+MODEL_CACHE_SIZE = int(os.getenv("LAW_MODEL_CACHE_SIZE", "256"))
+
+TOKEN_RE = re.compile(r'[가-힣A-Za-z0-9]+')
+_SPACE_RE = re.compile(r"\s+")
+
+
+def clean(text):
+    return _SPACE_RE.sub("", text or "")
+
+
+def normalize_number(text):
+    try:
+        return str(int(unicodedata.numeric(text)))
+    except:
+        return text
+
+
+def make_article_number(조문번호, 조문가지번호):
+    return f"제{조문번호}조의{조문가지번호}" if 조문가지번호 and 조문가지번호 != "0" else f"제{조문번호}조"
+
+
+class SubItem:
+    """목(목내용 하나). 줄 단위로 나눈 본문을 가진다."""
+    __slots__ = ("number", "text", "text_clean", "lines", "line_cleans", "line_tokens", "location")
+
+    def __init__(self, number, text, location):
+        self.number = number
+        self.text = text
+        self.text_clean = clean(text)
+        self.lines = [line.strip() for line in text.splitlines() if line.strip()]
+        self.line_cleans = [clean(line) for line in self.lines]
+        self.line_tokens = [TOKEN_RE.findall(line) for line in self.lines]
+        self.location = location
+
+
+class Item:
+    """호"""
+    __slots__ = ("number", "text", "text_clean", "tokens", "location", "sub_items")
+
+    def __init__(self, number, text, location, sub_items):
+        self.number = number
+        self.text = text
+        self.text_clean = clean(text)
+        self.tokens = TOKEN_RE.findall(text)
+        self.location = location
+        self.sub_items = sub_items
+
+
+class Paragraph:
+    """항"""
+    __slots__ = ("number", "text", "text_clean", "location", "items")
+
+    def __init__(self, number, text, location, items):
+        self.number = number
+        self.text = text
+        self.text_clean = clean(text)
+        self.location = location
+        self.items = items
+
+
+class Article:
+    """조문단위"""
+    __slots__ = ("label", "text", "text_clean", "paragraphs")
+
+    def __init__(self, label, text, paragraphs):
+        self.label = label
+        self.text = text
+        self.text_clean = clean(text)
+        self.paragraphs = paragraphs
+
+
+class LawDocument:
+    __slots__ = ("articles",)
+
+    def __init__(self, articles):
+        self.articles = articles
+
+
+def _parse_article(article):
+    label = make_article_number(article.findtext("조문번호", "").strip(), article.findtext("조문가지번호", "").strip())
+    paragraphs = []
+    for 항 in article.findall("항"):
+        항번호 = normalize_number(항.findtext("항번호", "").strip())
+        항위치 = f"{label}제{항번호}항" if 항번호 else label
+        items = []
+        for 호 in 항.findall("호"):
+            호번호 = 호.findtext("호번호")
+            호위치 = f"{항위치}제{호번호}호"
+            sub_items = []
+            for 목 in 호.findall("목"):
+                목번호 = 목.findtext("목번호")
+                for m in 목.findall("목내용"):
+                    if m.text:
+                        sub_items.append(SubItem(목번호, m.text, f"{호위치}{목번호}목"))
+            items.append(Item(호번호, 호.findtext("호내용", "") or "", 호위치, sub_items))
+        paragraphs.append(Paragraph(항번호, 항.findtext("항내용", "") or "", 항위치, items))
+    return Article(label, article.findtext("조문내용", "") or "", paragraphs)
+
+
+def iter_articles(xml_data):
+    """iterparse로 조문단위를 하나씩 읽어 Article로 돌려준다.
+
+    다 읽은 요소는 조문단위 안의 것이 아니면 바로 부모에서 떼어 내므로(부칙·별표·기본정보 등
+    쓰지 않는 부분도 마찬가지) ElementTree가 차지하는 메모리는 법령 전체가 아니라
+    가장 큰 조문이나 부칙 하나와 그 조상 요소 크기에 머문다. 형식이 잘못되면 ET.ParseError
+    """
+    open_elems = []
+    depth = 0
+    for event, elem in ET.iterparse(io.BytesIO(xml_data), events=("start", "end")):
+        if event == "start":
+            open_elems.append(elem)
+            if elem.tag == "조문단위":
+                depth += 1
+            continue
+        open_elems.pop()
+        if elem.tag == "조문단위":
+            depth -= 1
+            yield _parse_article(elem)
+        # 조문단위 안에 조문단위가 또 있으면 바깥 것까지 읽은 뒤에 떼어 낸다
+        if depth == 0 and open_elems:
+            open_elems[-1].remove(elem)
+
+
+def parse_law(xml_data):
+    """lawService XML bytes를 LawDocument로 바꾼다. 형식이 잘못되면 ET.ParseError"""
+    return LawDocument(list(iter_articles(xml_data)))
+
+
+def raw_text_clean(xml_data):
+    """파싱하지 않고 본문 bytes를 한 번 디코딩해 공백을 모두 없앤 문자열. 빠른 걸러내기용"""
+    return _SPACE_RE.sub("", xml_data.decode("utf-8", errors="replace"))
+
+
+class LawDocumentCache:
+    """MST → LawDocument 메모리 LRU"""
+
+    def __init__(self, max_entries=MODEL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def peek(self, mst):
+        """캐시에 있으면 LawDocument, 없으면 None. 파싱하지 않는다"""
+        with self._lock:
+            return self._entries.get(mst)
+
+    def get(self, mst, xml_data):
+        """캐시에 없으면 xml_data를 파싱해 넣고 돌려준다"""
+        with self._lock:
+            doc = self._entries.get(mst)
+            if doc is not None:
+                self._entries.move_to_end(mst)
+                return doc
+        doc = parse_law(xml_data)
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[mst] = doc
+                self._entries.move_to_end(mst)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return doc
+
+
+_default_cache = LawDocumentCache()
+
+
+def get_law_document(mst, xml_data):
+    """프로세스 공용 LRU를 거쳐 파싱된 법령을 얻는다"""
+    return _default_cache.get(mst, xml_data)
+
+
+def get_cached_law_document(mst):
+    """이미 파싱해 둔 법령이 있으면 돌려준다"""
+    return _default_cache.peek(mst)
@@ -1,66 +1,178 @@
-import requests
 import xml.etree.ElementTree as ET
-from urllib.parse import quote
 import re
 import os
-import unicodedata
-from collections import defaultdict
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from law_cache import get_default_cache
+from law_client import API_BASE, OC, LawApiError, get_client
+from law_index import get_default_index, get_default_indexer, parse_query, positive_terms
+from law_match import AhoCorasick
+from law_metrics import NULL_METRICS, REGISTRY, new_metrics
+from law_mirror import MIRROR_KND, get_mirror
+from law_model import clean, get_cached_law_document, get_law_document, make_article_number, normalize_number, raw_text_clean
+from law_result_cache import get_result_cache
 
-OC = os.getenv("OC", "chetera")
-BASE = "http://www.law.go.kr"
+BASE = API_BASE
+# 법령 본문을 동시에 받아올 최대 작업자 수
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+# 파싱을 기다리며 미리 받아 둘 본문 수(작업자 수의 배수). 캐시에서 바로 읽혀도 본문이 이 이상 쌓이지 않는다
+PREFETCH_PER_WORKER = 2
+LIST_PAGE_SIZE = 100
+# 같은 검색어의 법령 목록을 재사용하는 시간(초). 검색 직후 같은 단어로 개정문을 만들 때 목록 조회를 건너뛴다
+LIST_CACHE_TTL = float(os.getenv("LIST_CACHE_TTL", "300"))
+# 화면의 법령 종류 → lawSearch.do knd(법종구분) 코드
+LAW_KINDS = {
+    "법률": "A0002",
+    "대통령령": "A0003",
+    "총리령": "A0004",
+    "부령": "A0005",
+}
+
+@lru_cache(maxsize=256)
+def _highlight_pattern(query):
+    # 정규식 특수문자 이스케이프, 대소문자 구분없이 검색
+    return re.compile(f'({re.escape(query)})', re.IGNORECASE)
 
 def highlight(text, query):
     """검색어를 HTML로 하이라이트 처리해주는 함수"""
     if not query or not text:
         return text
-    # 정규식 특수문자 이스케이프
-    escaped_query = re.escape(query)
-    # 대소문자 구분없이 검색
-    pattern = re.compile(f'({escaped_query})', re.IGNORECASE)
-    return pattern.sub(r'<mark>\1</mark>', text)
+    return _highlight_pattern(query).sub(r'<mark>\1</mark>', text)
+
+def _fetch_law_list_page(exact_query, page, knd=LAW_KINDS["법률"]):
+    """lawSearch.do 한 페이지를 받아 (전체건수, 법령목록)을 돌려준다. 받지 못하면 LawApiError"""
+    content = get_client().get(
+        "lawSearch", target="law", type="XML", display=LIST_PAGE_SIZE, page=page,
+        search=2, knd=knd, query=exact_query,
+    )
+    root = ET.fromstring(content)
+    laws = [{
+        "법령명": law.findtext("법령명한글", "").strip(),
+        "MST": law.findtext("법령일련번호", "")
+    } for law in root.findall("law")]
+    total = root.findtext("totalCnt", "").strip()
+    return (int(total) if total.isdigit() else None), laws
 
-def get_law_list_from_api(query):
+def _fetch_law_list(query, knd=LAW_KINDS["법률"]):
+    """(법령 목록, totalCnt). 한 쪽이라도 받지 못하면 일부만 돌려주지 않고 LawApiError를 그대로 올린다.
+
+    목록을 못 받았는데 빈 목록을 돌려주면 화면에는 "개정 대상 조문이 없습니다"로 나오기 때문이다.
+    """
     exact_query = f'"{query}"'
-    encoded_query = quote(exact_query)
-    page = 1
-    laws = []
-    while True:
-        url = f"{BASE}/DRF/lawSearch.do?OC={OC}&target=law&type=XML&display=100&page={page}&search=2&knd=A0002&query={encoded_query}"
-        res = requests.get(url, timeout=10)
-        res.encoding = 'utf-8'
-        if res.status_code != 200:
-            break
-        root = ET.fromstring(res.content)
-        for law in root.findall("law"):
-            laws.append({
-                "법령명": law.findtext("법령명한글", "").strip(),
-                "MST": law.findtext("법령일련번호", "")
-            })
-        if len(root.findall("law")) < 100:
-            break
-        page += 1
-    return laws
+    total, laws = _fetch_law_list_page(exact_query, 1, knd)
+    pages = []
+    if total is not None:
+        last_page = -(-total // LIST_PAGE_SIZE)
+        if last_page > 1:
+            with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, last_page - 1)) as pool:
+                pages = list(pool.map(lambda p: _fetch_law_list_page(exact_query, p, knd), range(2, last_page + 1)))
+        for _, page_laws in pages:
+            laws.extend(page_laws)
+    else:
+        # totalCnt가 없으면 예전처럼 마지막 페이지가 나올 때까지 차례로 읽는다
+        page_no, page_laws = 1, laws
+        while len(page_laws) >= LIST_PAGE_SIZE:
+            page_no += 1
+            page_laws = _fetch_law_list_page(exact_query, page_no, knd)[1]
+            laws.extend(page_laws)
+    # 페이지 경계에서 같은 법령이 두 번 나올 수 있어 MST 기준으로 중복을 없앤다
+    seen = set()
+    unique = []
+    for law in laws:
+        if law["MST"] in seen:
+            continue
+        seen.add(law["MST"])
+        unique.append(law)
+    return unique, total
+
+_law_list_cache = {}
+_law_list_lock = threading.Lock()
+
+def get_law_list_from_api(query, knd=LAW_KINDS["법률"]):
+    """검색어가 본문에 들어 있는 법령 목록(knd는 법종구분 코드, 기본은 법률).
+    같은 검색어는 LIST_CACHE_TTL초 동안 다시 조회하지 않는다. 받는 사이 목록이 바뀌어
+    totalCnt보다 적게 받은 목록은 돌려주기만 하고 기억해 두지 않는다."""
+    now = time.monotonic()
+    with _law_list_lock:
+        cached = _law_list_cache.get((query, knd))
+        if cached and now - cached[0] < LIST_CACHE_TTL:
+            return list(cached[1])
+    laws, total = _fetch_law_list(query, knd)
+    with _law_list_lock:
+        for key in [k for k, (t, _) in _law_list_cache.items() if now - t >= LIST_CACHE_TTL]:
+            del _law_list_cache[key]
+        if laws and (total is None or len(laws) >= total):
+            _law_list_cache[(query, knd)] = (now, laws)
+    return list(laws)
+
+def load_law_text(mst):
+    """MST의 본문을 (본문, 캐시에서 읽었는지)로 돌려준다. 디스크 캐시를 먼저 본다"""
+    cache = get_default_cache()
+    if cache is not None:
+        cached = cache.get(mst)
+        if cached is not None:
+            return cached, True
+    content = get_client().get("lawService", target="law", MST=mst, type="XML")
+    if cache is not None:
+        cache.put(mst, content)
+    return content, False
+
+def fetch_law_text(mst):
+    """MST로 법령 본문 XML을 받아온다. 디스크 캐시를 먼저 보고, 실패하면 예외를 그대로 올린다."""
+    return load_law_text(mst)[0]
 
 def get_law_text_by_mst(mst):
-    url = f"{BASE}/DRF/lawService.do?OC={OC}&target=law&MST={mst}&type=XML"
     try:
-        res = requests.get(url, timeout=10)
-        res.encoding = 'utf-8'
-        return res.content if res.status_code == 200 else None
-    except:
+        return fetch_law_text(mst)
+    except Exception:
         return None
 
-def clean(text):
-    return re.sub(r"\s+", "", text or "")
+def _fetch_one(law, metrics=NULL_METRICS, load=load_law_text):
+    started = time.perf_counter()
+    try:
+        content, cached = load(law["MST"])
+    except Exception as e:
+        return law, None, e
+    metrics.fetch(law["MST"], time.perf_counter() - started, len(content or b""), cached)
+    return law, content, None
+
+def iter_law_texts(laws, max_workers=None, metrics=NULL_METRICS, load=load_law_text):
+    """법령 목록의 본문을 동시에 받아 목록 순서대로 (law, xml_data, error)를 돌려준다.
 
-def normalize_number(text):
+    load(mst)는 (본문, 캐시에서 읽었는지)를 돌려주는 함수로, 로컬 미러에서 읽을 때 바꿔 넣는다.
+    받는 쪽보다 앞서 받아 두는 본문은 작업자 수의 PREFETCH_PER_WORKER배까지다.
+    """
+    workers = max_workers or FETCH_WORKERS
+    if workers <= 1:
+        for law in laws:
+            yield _fetch_one(law, metrics, load)
+        return
+    pool = ThreadPoolExecutor(max_workers=workers)
+    laws = iter(laws)
+    window = deque()
     try:
-        return str(int(unicodedata.numeric(text)))
-    except:
-        return text
+        for law in laws:
+            window.append(pool.submit(_fetch_one, law, metrics, load))
+            if len(window) >= workers * PREFETCH_PER_WORKER:
+                break
+        while window:
+            fetched = window.popleft().result()
+            # 하나를 넘길 때마다 하나를 더 받기 시작해 창 크기를 유지한다
+            law = next(laws, None)
+            if law is not None:
+                window.append(pool.submit(_fetch_one, law, metrics, load))
+            yield fetched
+    finally:
+        # 시간 제한 등으로 중간에 멈추면 아직 시작하지 않은 받기는 취소한다
+        pool.shutdown(wait=True, cancel_futures=True)
 
-def make_article_number(조문번호, 조문가지번호):
-    return f"제{조문번호}조의{조문가지번호}" if 조문가지번호 and 조문가지번호 != "0" else f"제{조문번호}조"
+def _record_failure(failures, law, error):
+    if failures is not None:
+        failures.append({"법령명": law["법령명"], "MST": law["MST"], "사유": str(error)})
 
 def has_batchim(word):
     """단어의 마지막 글자에 받침이 있는지 확인"""
@@ -76,20 +188,28 @@ def has_rieul_batchim(word):
     code = ord(word[-1]) - 0xAC00
     return (code % 28) == 8  # ㄹ받침 코드는 8
 
+# 제외할 접미사 리스트
+SUFFIX_EXCLUDE = ["의", "에", "에서", "으로서", "등", "에게", "만", "만을", "만이", "만은", "만에", "만으로"]
+
+# 처리할 조사 리스트
+JOSA_LIST = ["을", "를", "과", "와", "이", "가", "이나", "나", "으로", "로", "은", "는", "란", "이란"]
+
+def _by_last_char(words):
+    """긴 것부터 맞춰 보도록 정렬한 뒤 마지막 글자별로 나눠 둔다"""
+    table = {}
+    for word in sorted(words, key=len, reverse=True):
+        table.setdefault(word[-1], []).append(word)
+    return table
+
+_SUFFIX_BY_LAST = _by_last_char(SUFFIX_EXCLUDE)
+_JOSA_BY_LAST = _by_last_char(JOSA_LIST)
+
 def extract_chunk_and_josa(token, searchword):
     """검색어를 포함하는 덩어리와 조사를 추출"""
-    # 제외할 접미사 리스트
-    suffix_exclude = ["의", "에", "에서", "으로서", "등", "에게", "만", "만을", "만이", "만은", "만에", "만으로"]
-    
-    # 처리할 조사 리스트
-    josa_list = ["을", "를", "과", "와", "이", "가", "이나", "나", "으로", "로", "은", "는", "란", "이란"]
-    
-    # 원본 토큰 저장
-    original_token = token
     suffix = None
     
-    # 1. 접미사 제거 시도
-    for s in sorted(suffix_exclude, key=len, reverse=True):
+    # 1. 접미사 제거 시도 (토큰과 마지막 글자가 같은 접미사만 보면 된다)
+    for s in _SUFFIX_BY_LAST.get(token[-1:], ()):
         if token.endswith(s) and len(token) > len(s):
             suffix = s
             token = token[:-len(s)]
@@ -104,7 +224,7 @@ def extract_chunk_and_josa(token, searchword):
         chunk = token
     # 검색어 + 조사 패턴 확인
     else:
-        for j in sorted(josa_list, key=len, reverse=True):
+        for j in _JOSA_BY_LAST.get(token[-1:], ()):
             if token.endswith(searchword + j):
                 chunk = token[:-len(j)]
                 josa = j
@@ -261,14 +381,56 @@ def apply_josa_rule(orig, replaced, josa):
     else:
         return f'"{orig}"를 "{replaced}"로 한다.'
 
+class CompiledQuery:
+    """검색어 하나에 대해 한 번만 준비해 두고 실행 내내 재사용하는 매칭 도구.
+
+    하이라이트 정규식을 미리 컴파일해 두고, 토큰별 덩어리·조사 추출 결과와
+    조사 규칙 결과를 기억해 같은 토큰이 다시 나오면 바로 돌려준다.
+    """
+
+    def __init__(self, query, replace_word=None, rule_cache=None):
+        self.query = query
+        self.keyword_clean = clean(query)
+        self.replace_word = replace_word
+        self.pattern = _highlight_pattern(query) if query else None
+        self._chunks = {}
+        # 여러 쌍을 한꺼번에 처리할 때는 조사 규칙 캐시를 함께 쓴다
+        self._rules = {} if rule_cache is None else rule_cache
+
+    def highlight(self, text):
+        if self.pattern is None or not text:
+            return text
+        return self.pattern.sub(r'<mark>\1</mark>', text)
+
+    def chunk(self, token):
+        """토큰 → (덩어리, 조사, 접미사, 바꾼 덩어리)"""
+        result = self._chunks.get(token)
+        if result is None:
+            chunk, josa, suffix = extract_chunk_and_josa(token, self.query)
+            replaced = chunk.replace(self.query, self.replace_word) if self.replace_word is not None else None
+            result = self._chunks[token] = (chunk, josa, suffix, replaced)
+        return result
+
+    def josa_rule(self, orig, replaced, josa):
+        key = (orig, replaced, josa)
+        rule = self._rules.get(key)
+        if rule is None:
+            rule = self._rules[key] = apply_josa_rule(orig, replaced, josa)
+        return rule
+
+_EMPTY_PARAGRAPH_RE = re.compile(r'제(?=항)')
+_ITEM_PERIOD_RE = re.compile(r'(\d+)\.호')
+_SUB_ITEM_PERIOD_RE = re.compile(r'([가-힣])\.목')
+
+@lru_cache(maxsize=65536)
 def format_location(location):
     """위치 정보 형식 수정: 항번호가 비어있는 경우와 호번호, 목번호의 period 제거"""
     # 항번호가 비어있는 경우 "제항" 제거
-    location = re.sub(r'제(?=항)', '', location)
+    location = _EMPTY_PARAGRAPH_RE.sub('', location)
     
     # 호번호와 목번호 뒤의 period(.) 제거
-    location = re.sub(r'(\d+)\.호', r'\1호', location)
-    location = re.sub(r'([가-힣])\.목', r'\1목', location)
+    location = _ITEM_PERIOD_RE.sub(r'\1호', location)
+    location = _SUB_ITEM_PERIOD_RE.sub(r'\1목', location)
     
     return location
 
@@ -281,139 +443,586 @@ def group_locations(loc_list):
         return formatted_locs[0]
     return 'ㆍ'.join(formatted_locs[:-1]) + ' 및 ' + formatted_locs[-1]
 
-def run_search_logic(query, unit="법률"):
-    result_dict = {}
-    keyword_clean = clean(query)
-    for law in get_law_list_from_api(query):
-        mst = law["MST"]
-        xml_data = get_law_text_by_mst(mst)
-        if not xml_data:
-            continue
-        tree = ET.fromstring(xml_data)
-        articles = tree.findall(".//조문단위")
-        law_results = []
-        for article in articles:
-            조번호 = article.findtext("조문번호", "").strip()
-            조가지번호 = article.findtext("조문가지번호", "").strip()
-            조문식별자 = make_article_number(조번호, 조가지번호)
-            조문내용 = article.findtext("조문내용", "") or ""
-            항들 = article.findall("항")
-            출력덩어리 = []
-            조출력 = keyword_clean in clean(조문내용)
-            첫_항출력됨 = False
-            if 조출력:
-                출력덩어리.append(highlight(조문내용, query))
-            for 항 in 항들:
-                항번호 = normalize_number(항.findtext("항번호", "").strip())
-                항내용 = 항.findtext("항내용", "") or ""
-                항출력 = keyword_clean in clean(항내용)
-                항덩어리 = []
-                하위검색됨 = False
-                for 호 in 항.findall("호"):
-                    호내용 = 호.findtext("호내용", "") or ""
-                    호출력 = keyword_clean in clean(호내용)
-                    if 호출력:
-                        하위검색됨 = True
-                        항덩어리.append("&nbsp;&nbsp;" + highlight(호내용, query))
-                    for 목 in 호.findall("목"):
-                        for m in 목.findall("목내용"):
-                            if m.text and keyword_clean in clean(m.text):
-                                줄들 = [line.strip() for line in m.text.splitlines() if line.strip()]
-                                줄들 = [highlight(line, query) for line in 줄들]
-                                if 줄들:
-                                    하위검색됨 = True
-                                    항덩어리.append(
-                                        "<div style='margin:0;padding:0'>" +
-                                        "<br>".join("&nbsp;&nbsp;&nbsp;&nbsp;" + line for line in 줄들) +
-                                        "</div>"
-                                    )
-                if 항출력 or 하위검색됨:
-                    if not 조출력 and not 첫_항출력됨:
-                        출력덩어리.append(f"{highlight(조문내용, query)} {highlight(항내용, query)}")
-                        첫_항출력됨 = True
-                    elif not 첫_항출력됨:
-                        출력덩어리.append(highlight(항내용, query))
-                        첫_항출력됨 = True
-                    else:
-                        출력덩어리.append(highlight(항내용, query))
-                    출력덩어리.extend(항덩어리)
-            if 출력덩어리:
-                law_results.append("<br>".join(출력덩어리))
-        if law_results:
-            result_dict[law["법령명"]] = law_results
-    return result_dict
+def search_law(doc, cq):
+    """파싱된 법령 하나에서 검색어가 들어 있는 조문을 하이라이트된 HTML 덩어리로 모은다"""
+    keyword_clean = cq.keyword_clean
+    highlight = cq.highlight
+    law_results = []
+    for article in doc.articles:
+        출력덩어리 = []
+        조출력 = keyword_clean in article.text_clean
+        첫_항출력됨 = False
+        if 조출력:
+            출력덩어리.append(highlight(article.text))
+        for 항 in article.paragraphs:
+            항출력 = keyword_clean in 항.text_clean
+            항덩어리 = []
+            하위검색됨 = False
+            for 호 in 항.items:
+                if keyword_clean in 호.text_clean:
+                    하위검색됨 = True
+                    항덩어리.append("&nbsp;&nbsp;" + highlight(호.text))
+                for 목 in 호.sub_items:
+                    if keyword_clean in 목.text_clean:
+                        줄들 = [highlight(line) for line in 목.lines]
+                        if 줄들:
+                            하위검색됨 = True
+                            항덩어리.append(
+                                "<div style='margin:0;padding:0'>" +
+                                "<br>".join("&nbsp;&nbsp;&nbsp;&nbsp;" + line for line in 줄들) +
+                                "</div>"
+                            )
+            if 항출력 or 하위검색됨:
+                if not 조출력 and not 첫_항출력됨:
+                    출력덩어리.append(f"{highlight(article.text)} {highlight(항.text)}")
+                    첫_항출력됨 = True
+                else:
+                    출력덩어리.append(highlight(항.text))
+                출력덩어리.extend(항덩어리)
+        if 출력덩어리:
+            law_results.append("<br>".join(출력덩어리))
+    return law_results
+
+# XML에서 이스케이프되는 글자가 든 검색어는 원문 bytes로 미리 걸러낼 수 없다
+_XML_ESCAPED = set('&<>"\'')
 
-def run_amendment_logic(find_word, replace_word):
-    """개정문 생성 로직"""
-    amendment_results = []
-    for idx, law in enumerate(get_law_list_from_api(find_word)):
-        law_name = law["법령명"]
-        mst = law["MST"]
-        xml_data = get_law_text_by_mst(mst)
-        if not xml_data:
+def make_prefilter(words):
+    """파싱 전에 원문에 찾는 단어가 하나라도 있는지 보는 함수. 미리 거를 수 없으면 None"""
+    words = [w for w in words if w]
+    if not words or any(_XML_ESCAPED & set(w) for w in words):
+        return None
+    return lambda text: any(w in text for w in words)
+
+def _iter_law_documents(laws, max_workers=None, metrics=NULL_METRICS, prefilter=None, load=load_law_text):
+    """본문을 받아 파싱한 결과를 목록 순서대로 (law, doc, error, 본문크기)로 돌려준다.
+
+    본문이 비어 있거나 prefilter(공백 없앤 원문)가 거짓이면 doc은 None이다. 걸러진 법령은 파싱하지 않는다.
+    """
+    indexer = get_default_indexer()
+    if indexer is None:
+        yield from _parse_law_texts(laws, max_workers, metrics, prefilter, load)
+        return
+    # 검색이 도는 동안에는 색인을 미뤄 CPU를 나눠 쓰지 않게 한다
+    with indexer.hold():
+        yield from _parse_law_texts(laws, max_workers, metrics, prefilter, load, indexer)
+
+def _parse_law_texts(laws, max_workers, metrics, prefilter, load, indexer=None):
+    texts = iter_law_texts(laws, max_workers, metrics, load)
+    while True:
+        # 다음 본문이 준비될 때까지 기다린 시간
+        with metrics.stage("fetch"):
+            fetched = next(texts, None)
+        if fetched is None:
+            break
+        law, xml_data, error = fetched
+        metrics.count("laws")
+        if error is not None or not xml_data:
+            yield law, None, error, 0
             continue
-        tree = ET.fromstring(xml_data)
-        articles = tree.findall(".//조문단위")
-        chunk_map = defaultdict(list)
-
-        for article in articles:
-            조번호 = article.findtext("조문번호", "").strip()
-            조가지번호 = article.findtext("조문가지번호", "").strip()
-            조문식별자 = make_article_number(조번호, 조가지번호)
-
-            for 항 in article.findall("항"):
-                항번호 = normalize_number(항.findtext("항번호", "").strip())
-                항번호_부분 = f"제{항번호}항" if 항번호 else ""
-                
-                for 호 in 항.findall("호"):
-                    호번호 = 호.findtext("호번호")
-                    호내용 = 호.findtext("호내용", "") or ""
-                    if find_word in clean(호내용):
-                        tokens = re.findall(r'[가-힣A-Za-z0-9]+', 호내용)
-                        for token in tokens:
-                            if find_word in token:
-                                chunk, josa, suffix = extract_chunk_and_josa(token, find_word)
-                                replaced = chunk.replace(find_word, replace_word)
-                                
-                                # 위치 정보 저장 (항번호가 없는 경우 처리)
-                                location = f"{조문식별자}{항번호_부분}제{호번호}호"
-                                chunk_map[(chunk, replaced, josa, suffix)].append(location)
-
-                    for 목 in 호.findall("목"):
-                        목번호 = 목.findtext("목번호")
-                        for m in 목.findall("목내용"):
-                            if m.text:
-                                줄들 = [line.strip() for line in m.text.splitlines() if line.strip()]
-                                for 줄 in 줄들:
-                                    if find_word in clean(줄):
-                                        tokens = re.findall(r'[가-힣A-Za-z0-9]+', 줄)
-                                        for token in tokens:
-                                            if find_word in token:
-                                                chunk, josa, suffix = extract_chunk_and_josa(token, find_word)
-                                                replaced = chunk.replace(find_word, replace_word)
-                                                
-                                                # 위치 정보 저장 (항번호가 없는 경우 처리)
-                                                location = f"{조문식별자}{항번호_부분}제{호번호}호{목번호}목"
-                                                chunk_map[(chunk, replaced, josa, suffix)].append(location)
-
-        if not chunk_map:
+        if prefilter is not None and get_cached_law_document(law["MST"]) is None:
+            with metrics.stage("prefilter"):
+                keep = prefilter(raw_text_clean(xml_data))
+            if not keep:
+                metrics.count("rejected")
+                yield law, None, None, len(xml_data)
+                continue
+        try:
+            with metrics.stage("parse"):
+                doc = get_law_document(law["MST"], xml_data)
+        except ET.ParseError as e:
+            yield law, None, e, len(xml_data)
             continue
+        metrics.count("articles", len(doc.articles))
+        # 색인을 켰으면 받아 온 본문을 백그라운드에서 로컬 색인에 넣는다
+        if indexer is not None:
+            indexer.submit(law["MST"], law["법령명"], doc)
+        yield law, doc, None, len(xml_data)
+
+def metrics_text():
+    """프로세스 누적 측정값과 API 응답 시간 히스토그램을 Prometheus 텍스트 형식으로"""
+    return REGISTRY.prometheus(get_client().latency_stats())
 
-        result_lines = []
-        for (chunk, replaced, josa, suffix), locations in chunk_map.items():
-            loc_str = group_locations(sorted(set(locations)))
-            
-            # 접미사 처리
-            if suffix:
-                orig_with_suffix = chunk + suffix
-                replaced_with_suffix = replaced + suffix
-                rule = apply_josa_rule(orig_with_suffix, replaced_with_suffix, josa)
+def save_index():
+    """백그라운드에서 하던 색인을 마치고 새로 들어간 법령을 디스크에 저장한다"""
+    indexer = get_default_indexer()
+    if indexer is not None:
+        indexer.flush()
+
+def _iter_search(ranked, total, load, cq, max_workers=None, metrics=NULL_METRICS):
+    total_bytes = 0
+    laws = [law for _, law in ranked]
+    documents = _iter_law_documents(laws, max_workers, metrics, make_prefilter([cq.keyword_clean]), load)
+    for done, ((rank, _), (law, doc, error, size)) in enumerate(zip(ranked, documents), total - len(ranked) + 1):
+        total_bytes += size
+        sections = []
+        if doc is not None:
+            with metrics.stage("match"):
+                sections = search_law(doc, cq)
+            metrics.count("sections", len(sections))
+        yield {
+            "법령명": law["법령명"],
+            "MST": law["MST"],
+            "sections": sections,
+            "error": error,
+            "index": rank,
+            "done": done,
+            "total": total,
+            "bytes": total_bytes,
+        }
+
+def _no_failures(items):
+    """본문을 받지 못한 법령이 있는 결과는 결과 캐시에 남기지 않는다"""
+    return all(item["error"] is None for item in items)
+
+def _law_list_key(ranked):
+    # 검색어가 같아도 목록(MST)이 바뀌면 새 법령 버전이 나온 것이므로 다른 결과로 본다
+    return tuple((rank, law["MST"]) for rank, law in sorted(ranked, key=lambda x: x[0]))
+
+def _plan(laws, resume=None, use_mirror=False):
+    """(목록 순번, 법령) 처리 순서와 전체 법령 수.
+
+    본문을 이미 가진 법령(파싱 결과나 디스크 캐시)을 먼저 하고 나머지는 목록 순서대로 한다.
+    시간 제한이 있을 때 받기를 기다리지 않고 바로 나오는 결과부터 보여 주기 위해서다.
+    resume(이어서 하기 표)이 있으면 그 안의 남은 법령만 다시 줄 세운다.
+    """
+    if resume is not None:
+        ranked = [(rank, law) for rank, law in resume["remaining"]]
+        total = resume["total"]
+    else:
+        ranked = list(enumerate(laws))
+        total = len(laws)
+    if use_mirror:
+        return ranked, total
+    cache = get_default_cache()
+
+    def is_local(entry):
+        mst = entry[1]["MST"]
+        return get_cached_law_document(mst) is not None or (cache is not None and mst in cache)
+
+    return sorted(ranked, key=lambda entry: not is_local(entry)), total
+
+def _run_plan(key, ranked, total, produce, metrics, budget=None, part=None, done=()):
+    """결과 캐시를 거쳐 항목을 돌려주다가 budget초가 지나면 멈춘다.
+
+    멈추면 part dict에 전체 법령 수, 남은 법령·목록 순번, 끝낸 법령의 [목록 순번, MST]를 적고, 지금까지 나온
+    항목은 결과 캐시에 ("partial", 전체 목록 key)로 넣어 둔다. done은 앞서 멈춘 실행들의 [목록 순번, MST]다.
+    그 항목이 결과 캐시에 남아 있으면 이번 항목과 함께 전체 목록 key로 넣으므로, 이어서 끝까지 하면 처음부터
+    한 번에 한 것과 같은 결과가 남는다. 앞서 나온 항목은 다시 돌려주지 않는다.
+    """
+    deadline = time.monotonic() + budget if budget else None
+    remaining = {rank for rank, _ in ranked}
+    cache = get_result_cache()
+    full_key = key + (_law_list_key([(rank, {"MST": mst}) for rank, mst in done] + list(ranked)),)
+    earlier = []
+    if done:
+        earlier = cache.peek(("partial",) + full_key)
+        if earlier is None or sorted(item["index"] for item in earlier) != sorted(rank for rank, _ in done):
+            # 앞선 항목이 캐시에서 빠졌으면 남은 법령만의 결과로 다룬다
+            earlier = []
+            full_key = key + (_law_list_key(ranked),)
+
+    def produce_all():
+        yield from earlier
+        yield from produce()
+
+    # 처리 순서는 캐시 상태에 따라 달라지므로 항목은 목록 순번으로 구별한다
+    items = cache.stream(full_key, produce_all if earlier else produce, _no_failures, metrics,
+                         item_key=lambda item: item["index"])
+    seen = []
+    try:
+        for item in items:
+            seen.append(item)
+            if item["index"] not in remaining:
+                continue
+            remaining.discard(item["index"])
+            yield item
+            if deadline is not None and remaining and time.monotonic() >= deadline:
+                metrics.count("deadline_stops")
+                if part is not None:
+                    seen_ranks = {item["index"] for item in seen}
+                    part.update(total=total, remaining=[[rank, law] for rank, law in sorted(ranked) if rank in remaining],
+                                done=[[rank, mst] for rank, mst in done if rank not in seen_ranks]
+                                + [[item["index"], item["MST"]] for item in seen])
+                    cache.put(("partial",) + full_key, seen)
+                break
+        else:
+            if done:
+                # 끝까지 했으면 전체 목록 key로 남았으므로 중간 결과는 버린다
+                cache.discard(("partial",) + full_key)
+    finally:
+        items.close()
+
+def law_kinds(unit):
+    """unit(법령 종류 이름 또는 그 목록) → 종류 이름 목록. LAW_KINDS에 없는 종류면 ValueError"""
+    kinds = [unit] if isinstance(unit, str) else list(dict.fromkeys(unit))
+    unknown = [kind for kind in kinds if kind not in LAW_KINDS]
+    if unknown or not kinds:
+        raise ValueError(f"알 수 없는 법령 종류: {', '.join(unknown)}")
+    return kinds
+
+def _plan_kinds(kinds, words, max_workers=None, use_mirror=False, resume=None):
+    """종류마다 (종류, 처리 순서, 전체 법령 수, 본문 읽는 함수, 앞서 끝낸 법령). 목록은 종류별로 동시에 받는다.
+
+    resume이 있으면 그 안에 남은 일이 있는 종류만, 남은 법령만 다시 줄 세운다.
+    """
+    if resume is not None:
+        kinds = [kind for kind in kinds if kind in resume["parts"]]
+
+    def plan(kind):
+        knd = LAW_KINDS[kind]
+        local_only = use_mirror and knd == MIRROR_KND
+        if resume is not None:
+            part = resume["parts"][kind]
+            ranked, total = _plan(None, part, local_only)
+            return kind, ranked, total, _text_loader(use_mirror, knd), part.get("done", [])
+        laws, load = _get_law_list(words, max_workers, use_mirror, knd)
+        ranked, total = _plan(laws, None, local_only)
+        return kind, ranked, total, load, []
+
+    if len(kinds) <= 1:
+        return [plan(kind) for kind in kinds]
+    with ThreadPoolExecutor(max_workers=len(kinds)) as pool:
+        return list(pool.map(plan, kinds))
+
+_STREAM_DONE = object()
+
+def _merge_streams(streams):
+    """(이름, 생성기) 여러 개를 각자의 스레드에서 돌려 나오는 대로 (이름, 항목)으로 합친다.
+
+    하나뿐이면 스레드 없이 그대로 돌린다. 생성기에서 난 예외는 받는 쪽에서 다시 올린다.
+    """
+    if len(streams) == 1:
+        name, items = streams[0]
+        for item in items:
+            yield name, item
+        return
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def pump(name, items):
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                results.put((name, item, None))
+        except Exception as e:
+            results.put((name, None, e))
+        finally:
+            items.close()
+            results.put((name, _STREAM_DONE, None))
+
+    threads = [threading.Thread(target=pump, args=stream, daemon=True) for stream in streams]
+    for thread in threads:
+        thread.start()
+    try:
+        running = len(threads)
+        while running:
+            name, item, error = results.get()
+            if error is not None:
+                raise error
+            if item is _STREAM_DONE:
+                running -= 1
+                continue
+            yield name, item
+    finally:
+        # 받는 쪽이 먼저 멈추면 나머지 종류도 지금 법령까지만 하고 멈춘다
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+def _fan_out(plans, run_kind, continuation=None, **token):
+    """종류별 처리를 동시에 돌려 끝나는 법령부터 돌려준다.
+
+    run_kind(종류, 처리 순서, 전체 법령 수, 본문 읽는 함수, 앞서 끝낸 법령, part)는 그 종류의 항목 생성기다.
+    항목에 법령종류를 붙이고 done·total·bytes는 모든 종류를 합친 값으로 바꾼다.
+    시간 제한에 걸린 종류가 있으면 continuation에 종류별 남은 일(parts)을 적는다.
+    """
+    grand_total = sum(total for _, _, total, _, _ in plans)
+    progress = {kind: (total - len(ranked), 0) for kind, ranked, total, _, _ in plans}
+    parts = {kind: {} for kind, _, _, _, _ in plans}
+    streams = [(kind, run_kind(kind, ranked, total, load, done, parts[kind]))
+               for kind, ranked, total, load, done in plans]
+    try:
+        for kind, item in _merge_streams(streams):
+            progress[kind] = (item["done"], item["bytes"])
+            # 결과 캐시의 항목을 여러 세션이 함께 보므로 고치지 않고 새로 만든다
+            yield dict(
+                item,
+                법령종류=kind,
+                done=sum(done for done, _ in progress.values()),
+                total=grand_total,
+                bytes=sum(size for _, size in progress.values()),
+            )
+    finally:
+        if continuation is not None and any(parts.values()):
+            continuation.update(token, parts={kind: part for kind, part in parts.items() if part})
+
+def iter_search_results(query, unit="법률", max_workers=None, metrics=NULL_METRICS, use_mirror=False,
+                        budget=None, resume=None, continuation=None):
+    """법령 하나를 처리할 때마다 결과와 진행 상황을 돌려준다.
+
+    각 항목은 법령종류, 법령명, MST, sections(검색된 조문 HTML 목록, 없으면 빈 리스트), error,
+    index(종류 안의 목록 순번), done(처리한 법령 수), total(전체 법령 수), bytes(지금까지 받은 본문 크기)를 담은 dict다.
+    unit은 LAW_KINDS의 종류 이름이나 그 목록이다. 여러 종류면 종류별로 동시에 처리해 끝나는 대로 섞어 돌려준다.
+    본문을 이미 가진 법령부터 처리하므로 항목은 목록 순서가 아닐 수 있다(index로 정렬한다).
+    metrics(law_metrics.Metrics)를 넘기면 단계별 시간과 처리량을 기록한다.
+    같은 검색이 결과 캐시에 있거나 다른 세션에서 실행 중이면 그 결과를 함께 쓴다.
+    use_mirror=True이면 법률은 API 대신 로컬 미러(law_mirror)에서 목록과 본문을 읽는다.
+    budget초가 지나면 멈추고 continuation dict에 이어서 할 곳을 적는다. 그 dict를 resume으로 넘기면 이어서 한다.
+    법령 목록을 받지 못하면 빈 결과를 내지 않고 LawApiError를 올린다.
+    """
+    try:
+        cq = CompiledQuery(query)
+        kinds = law_kinds(unit)
+        with metrics.stage("listing"):
+            plans = _plan_kinds(kinds, [query], max_workers, use_mirror, resume)
+
+        def run_kind(kind, ranked, total, load, done, part):
+            key = ("search", query, kind, use_mirror)
+            return _run_plan(key, ranked, total, lambda: _iter_search(ranked, total, load, cq, max_workers, metrics),
+                             metrics, budget, part, done)
+
+        yield from _fan_out(plans, run_kind, continuation, kind="search", query=query, unit=kinds)
+    finally:
+        metrics.finish()
+
+def search_index(query):
+    """로컬 색인에서 AND/OR/NOT·구절 검색식으로 찾는다. 색인에 들어 있는 법령만 대상이다.
+
+    결과 형식은 run_search_logic과 같다. 검색식이 잘못되면 law_index.QuerySyntaxError
+    """
+    index = get_default_index()
+    if index is None:
+        return {}
+    terms = positive_terms(parse_query(query))
+    pattern = re.compile("(" + "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True)) + ")") if terms else None
+
+    def mark(text):
+        text = "<br>".join(line.strip() for line in text.splitlines() if line.strip())
+        return pattern.sub(r'<mark>\1</mark>', text) if pattern else text
+
+    result_dict = {}
+    for _, law_name, articles in index.search(query):
+        result_dict[law_name] = [
+            "<br>".join([mark(hits[0][1])] + ["&nbsp;&nbsp;" + mark(text) for _, text in hits[1:]])
+            for hits in articles
+        ]
+    return result_dict
+
+def run_search_logic(query, unit="법률", max_workers=None, failures=None, use_index=False, metrics=NULL_METRICS,
+                     use_mirror=False, budget=None, resume=None, continuation=None):
+    """검색어가 포함된 조문을 법령별로 모은다. failures 리스트를 넘기면 본문을 받지 못한 법령이 기록된다.
+
+    use_index=True이면 API를 부르지 않고 로컬 색인에서 검색식(AND/OR/NOT, "구절")으로 찾는다.
+    use_mirror=True이면 로컬 미러에 받아 둔 법률 전체에서 찾는다.
+    budget(초)을 주면 그때까지 끝난 법령만 돌려주고, 남은 일이 있으면 continuation dict에 적는다.
+    그 dict를 resume으로 넘겨 다시 부르면 남은 법령만 처리한다.
+    unit에 종류 이름 목록(예: ["법률", "대통령령", "부령"])을 주면 종류별로 동시에 찾아 {종류: {법령명: 조문}}으로 돌려준다.
+    """
+    if use_index:
+        return search_index(query)
+    kinds = law_kinds(unit)
+    grouped = {kind: {} for kind in kinds}
+    items = iter_search_results(query, unit, max_workers, metrics, use_mirror, budget, resume, continuation)
+    for item in sorted(items, key=lambda item: item["index"]):
+        if item["error"] is not None:
+            _record_failure(failures, item, item["error"])
+        elif item["sections"]:
+            grouped[item["법령종류"]][item["법령명"]] = item["sections"]
+    return grouped[kinds[0]] if isinstance(unit, str) else grouped
+
+def _combined_chunk(token, spans, compiled):
+    """서로 다른 찾을 단어가 여럿 든 토큰 → 모두 바꾼 (덩어리, 조사, 접미사, 바꾼 덩어리)"""
+    # 조사는 덩어리 끝에 붙으므로 마지막 단어로 덩어리와 조사를 가른다
+    chunk, josa, suffix, _ = compiled[spans[-1][1]].chunk(token)
+    parts = []
+    pos = 0
+    for start, word in spans:
+        if start + len(word) > len(chunk):
+            break
+        parts.append(chunk[pos:start])
+        parts.append(compiled[word].replace_word)
+        pos = start + len(word)
+    parts.append(chunk[pos:])
+    return chunk, josa, suffix, "".join(parts)
+
+def collect_chunks(doc, matcher, compiled, metrics=NULL_METRICS):
+    """호·목 본문에서 찾을 단어가 든 토큰을 (덩어리, 바꾼 덩어리, 조사, 접미사)별 위치 목록으로 모은다.
+
+    matcher는 찾을 단어들로 만든 AhoCorasick, compiled는 찾을 단어 → CompiledQuery dict다.
+    찾을 단어끼리 겹치면(예: 지방자치단체와 자치단체) 토큰마다 먼저 시작하는(같으면 긴) 단어만 바꾸고,
+    한 토큰에 서로 다른 찾을 단어가 여럿 들어 있으면 모두 바꾼 규칙 하나로 만든다.
+    """
+    chunk_map = defaultdict(list)
+
+    def add_tokens(tokens, location):
+        metrics.count("tokens", len(tokens))
+        for token in tokens:
+            spans = matcher.find_longest(token)
+            if not spans:
+                continue
+            if all(word == spans[0][1] for _, word in spans[1:]):
+                key = compiled[spans[0][1]].chunk(token)
             else:
-                rule = apply_josa_rule(chunk, replaced, josa)
-                
-            result_lines.append(f"{loc_str} 중 {rule}")
+                key = _combined_chunk(token, spans, compiled)
+            chunk, josa, suffix, replaced = key
+            chunk_map[(chunk, replaced, josa, suffix)].append(location)
+
+    for article in doc.articles:
+        for 항 in article.paragraphs:
+            for 호 in 항.items:
+                if matcher.contains_any(호.text_clean):
+                    add_tokens(호.tokens, 호.location)
+                for 목 in 호.sub_items:
+                    for line_clean, tokens in zip(목.line_cleans, 목.line_tokens):
+                        if matcher.contains_any(line_clean):
+                            add_tokens(tokens, 목.location)
+    return chunk_map
+
+def format_amendment(prefix, law_name, chunk_map, josa_rule=apply_josa_rule):
+    """collect_chunks 결과로 법령 하나의 개정문을 만든다. prefix는 amendment_prefix(순번)이다"""
+    result_lines = []
+    for (chunk, replaced, josa, suffix), locations in chunk_map.items():
+        loc_str = group_locations(sorted(set(locations)))
+
+        # 접미사 처리
+        if suffix:
+            orig_with_suffix = chunk + suffix
+            replaced_with_suffix = replaced + suffix
+            rule = josa_rule(orig_with_suffix, replaced_with_suffix, josa)
+        else:
+            rule = josa_rule(chunk, replaced, josa)
+
+        result_lines.append(f"{loc_str} 중 {rule}")
+
+    return f"{prefix} {law_name} 일부를 다음과 같이 개정한다.\n" + "\n".join(result_lines)
+
+def amendment_prefix(idx):
+    """개정문 항목 번호. 20번째까지는 원문자, 그 뒤로는 (21) 형식"""
+    return chr(9312 + idx) if idx < 20 else f'({idx + 1})'
+
+def _get_law_list_union(words, max_workers=None, knd=LAW_KINDS["법률"]):
+    """여러 단어의 법령 목록을 동시에 받아 처음 나온 순서대로 MST 중복 없이 합친다"""
+    if len(words) == 1:
+        return get_law_list_from_api(words[0], knd)
+    with ThreadPoolExecutor(max_workers=min(max_workers or FETCH_WORKERS, len(words))) as pool:
+        lists = list(pool.map(lambda word: get_law_list_from_api(word, knd), words))
+    seen = set()
+    laws = []
+    for law_list in lists:
+        for law in law_list:
+            if law["MST"] not in seen:
+                seen.add(law["MST"])
+                laws.append(law)
+    return laws
+
+def _iter_amendments(ranked, total, load, matcher, compiled, max_workers=None, metrics=NULL_METRICS):
+    josa_rule = next(iter(compiled.values())).josa_rule
+    total_bytes = 0
+    laws = [law for _, law in ranked]
+    documents = _iter_law_documents(laws, max_workers, metrics, make_prefilter(list(compiled)), load)
+    for done, ((idx, _), (law, doc, error, size)) in enumerate(zip(ranked, documents), total - len(ranked) + 1):
+        total_bytes += size
+        text = None
+        if doc is not None:
+            with metrics.stage("match"):
+                chunk_map = collect_chunks(doc, matcher, compiled, metrics)
+            if chunk_map:
+                with metrics.stage("format"):
+                    text = format_amendment(amendment_prefix(idx), law["법령명"], chunk_map, josa_rule)
+        yield {
+            "법령명": law["법령명"],
+            "MST": law["MST"],
+            "text": text,
+            "error": error,
+            "index": idx,
+            "done": done,
+            "total": total,
+            "bytes": total_bytes,
+        }
+
+def _text_loader(use_mirror=False, knd=LAW_KINDS["법률"]):
+    # 미러에는 법률만 있으므로 다른 종류는 API(디스크 캐시)에서 읽는다
+    return get_mirror().load if use_mirror and knd == MIRROR_KND else load_law_text
+
+def _get_law_list(words, max_workers=None, use_mirror=False, knd=LAW_KINDS["법률"]):
+    """(법령 목록, 본문 읽는 함수). use_mirror=True이면 법률은 로컬 미러에서 찾는다"""
+    if use_mirror and knd == MIRROR_KND:
+        mirror = get_mirror()
+        return mirror.find(words), mirror.load
+    return _get_law_list_union(words, max_workers, knd), _text_loader(use_mirror, knd)
+
+def iter_batch_amendments(pairs, max_workers=None, metrics=NULL_METRICS, use_mirror=False,
+                          budget=None, resume=None, continuation=None, unit="법률"):
+    """여러 (찾을 단어, 바꿀 단어) 쌍을 한 번에 처리한다.
+
+    관련 법령을 한 번씩만 받아, 모든 찾을 단어를 한 번의 훑기로 찾고 법령마다 하나의
+    "일부를 다음과 같이 개정한다" 문단으로 합친다. 같은 찾을 단어가 여러 번 나오면 처음 쌍을 쓴다.
+    찾을 단어끼리 겹치는 곳은 collect_chunks와 같이 먼저 시작하는(같으면 긴) 단어로만 바꾼다.
+    돌려주는 항목과 budget·resume·continuation·unit, 목록을 받지 못했을 때의 LawApiError는 iter_amendments와 같다.
+    """
+    replacements = {}
+    for find_word, replace_word in pairs:
+        if find_word and replace_word and find_word not in replacements:
+            replacements[find_word] = replace_word
+    if not replacements:
+        return
+    try:
+        matcher = AhoCorasick(replacements)
+        rule_cache = {}
+        compiled = {w: CompiledQuery(w, r, rule_cache) for w, r in replacements.items()}
+        kinds = law_kinds(unit)
+        with metrics.stage("listing"):
+            plans = _plan_kinds(kinds, list(replacements), max_workers, use_mirror, resume)
+
+        def run_kind(kind, ranked, total, load, done, part):
+            key = ("amend", tuple(replacements.items()), kind, use_mirror)
+            return _run_plan(
+                key, ranked, total, lambda: _iter_amendments(ranked, total, load, matcher, compiled, max_workers, metrics),
+                metrics, budget, part, done)
+
+        yield from _fan_out(plans, run_kind, continuation,
+                            kind="amend", pairs=[list(pair) for pair in replacements.items()], unit=kinds)
+    finally:
+        metrics.finish()
+
+def iter_amendments(find_word, replace_word, max_workers=None, metrics=NULL_METRICS, use_mirror=False,
+                    budget=None, resume=None, continuation=None, unit="법률"):
+    """법령 하나를 처리할 때마다 개정문과 진행 상황을 돌려준다.
+
+    각 항목은 법령종류, 법령명, MST, text(개정문, 개정할 곳이 없으면 None), error, index, done, total, bytes를 담은 dict다.
+    항목 번호는 run_amendment_logic과 같이 종류별 법령 목록에서의 순서(index)를 따르므로 이어서 해도 번호가 이어진다.
+    budget·resume·continuation·unit은 iter_search_results와 같고, 목록을 받지 못하면 LawApiError를 올린다.
+    """
+    return iter_batch_amendments([(find_word, replace_word)], max_workers, metrics, use_mirror,
+                                 budget, resume, continuation, unit)
+
+def _collect_amendments(items, failures, unit="법률"):
+    """개정문을 종류별 목록 순서로 모은다. unit이 종류 목록이면 {종류: 개정문 목록}"""
+    kinds = law_kinds(unit)
+    grouped = {kind: [] for kind in kinds}
+    for item in sorted(items, key=lambda item: item["index"]):
+        if item["error"] is not None:
+            _record_failure(failures, item, item["error"])
+        elif item["text"]:
+            grouped[item["법령종류"]].append(item["text"])
+    for kind, texts in grouped.items():
+        if not texts:
+            texts.append("⚠️ 개정 대상 조문이 없습니다.")
+    return grouped[kinds[0]] if isinstance(unit, str) else grouped
+
+def run_amendment_logic(find_word, replace_word, max_workers=None, failures=None, metrics=NULL_METRICS,
+                        use_mirror=False, budget=None, resume=None, continuation=None, unit="법률"):
+    """개정문 생성 로직. failures 리스트를 넘기면 본문을 받지 못한 법령이 기록된다.
 
-        prefix = chr(9312 + idx) if idx < 20 else f'({idx + 1})'
-        amendment_results.append(f"{prefix} {law_name} 일부를 다음과 같이 개정한다.\n" + "\n".join(result_lines))
+    use_mirror=True이면 법률은 API 대신 로컬 미러에서 목록과 본문을 읽는다.
+    budget·resume·continuation·unit은 run_search_logic과 같다. unit이 종류 목록이면 {종류: 개정문 목록}을 돌려준다.
+    """
+    items = iter_amendments(find_word, replace_word, max_workers, metrics, use_mirror, budget, resume, continuation, unit)
+    return _collect_amendments(items, failures, unit)
 
-    return amendment_results if amendment_results else ["⚠️ 개정 대상 조문이 없습니다."]
+def run_batch_amendment_logic(pairs, max_workers=None, failures=None, metrics=NULL_METRICS, use_mirror=False,
+                              budget=None, resume=None, continuation=None, unit="법률"):
+    """여러 (찾을 단어, 바꿀 단어) 쌍의 개정문을 법령별로 합쳐 만든다"""
+    items = iter_batch_amendments(pairs, max_workers, metrics, use_mirror, budget, resume, continuation, unit)
+    return _collect_amendments(items, failures, unit)
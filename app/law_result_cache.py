@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# 여러 Streamlit 세션이 함께 쓰는 프로세스 공용 결과 캐시.
+# 결과는 법령별 항목(iter_search_results 등이 돌려주는 dict)의 목록으로 저장하고,
+# 같은 요청이 실행 중이면 새로 돌리지 않고 그 실행이 내놓는 항목을 함께 받아 본다(single-flight).
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "600"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def estimate_size(value):
+    """결과가 차지하는 메모리를 대략 어림한다"""
+    if isinstance(value, str):
+        return 50 + 2 * len(value)
+    if isinstance(value, (bytes, bytearray)):
+        return 33 + len(value)
+    if isinstance(value, dict):
+        return 64 + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(estimate_size(v) for v in value)
+    return 32
+
+
+class _Flight:
+    """실행 중인 요청 하나. 앞선 실행이 내놓는 항목을 뒤따른 요청들이 함께 읽는다"""
+
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.aborted = False
+        self.cond = threading.Condition()
+
+    def append(self, item):
+        with self.cond:
+            self.items.append(item)
+            self.cond.notify_all()
+
+    def close(self, aborted):
+        with self.cond:
+            self.done = True
+            self.aborted = aborted
+            self.cond.notify_all()
+
+    def follow(self):
+        """지금까지 나온 항목과 앞으로 나올 항목을 차례로 돌려준다. 앞선 실행이 중단되면 멈춘다"""
+        pos = 0
+        while True:
+            with self.cond:
+                while pos >= len(self.items) and not self.done:
+                    self.cond.wait()
+                if pos >= len(self.items):
+                    return
+                item = self.items[pos]
+            pos += 1
+            yield item
+
+
+class ResultCache:
+    """TTL과 메모리 상한이 있는 LRU 결과 캐시 + single-flight"""
+
+    def __init__(self, ttl=RESULT_CACHE_TTL, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored, size, items = entry
+        if now - stored >= self.ttl:
+            del self._entries[key]
+            self._bytes -= size
+            return None
+        self._entries.move_to_end(key)
+        return items
+
+    def _store(self, key, items):
+        size = estimate_size(items)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (time.monotonic(), size, items)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, old_size, _) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+
+    def peek(self, key):
+        """저장된 항목 목록. 없거나 만료됐으면 None. 적중 횟수에는 넣지 않는다"""
+        with self._lock:
+            return self._lookup(key, time.monotonic())
+
+    def put(self, key, items):
+        """항목 목록을 저장한다. 캐시를 끈 경우(ttl<=0)에는 아무 일도 하지 않는다"""
+        if self.ttl > 0:
+            self._store(key, list(items))
+
+    def discard(self, key):
+        """key의 항목을 지운다"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def stream(self, key, produce, cacheable=None, metrics=None, item_key=None):
+        """key의 결과 항목을 차례로 돌려준다.
+
+        캐시에 있으면 그대로, 같은 key가 실행 중이면 그 실행을 따라 읽고, 아니면 produce()를 돌려
+        나오는 대로 넘기면서 저장한다. cacheable(items)가 거짓이면(예: 본문을 못 받은 법령이 있음) 저장하지 않는다.
+        item_key(항목)는 항목을 구별하는 값이다. 앞선 실행이 중간에 멈춰 직접 계산할 때 이미 받은 항목을 이 값으로
+        건너뛴다. produce()의 순서가 실행마다 다를 수 있으면(예: 캐시에 있는 법령부터 처리) 꼭 넘겨야 하고,
+        주지 않으면 순서로 건너뛴다.
+        """
+        if self.ttl <= 0:
+            yield from produce()
+            return
+        with self._lock:
+            items = self._lookup(key, time.monotonic())
+            if items is not None:
+                self.hits += 1
+            else:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+        if items is not None:
+            if metrics is not None:
+                metrics.count("result_cache_hits")
+            yield from items
+            return
+        if not leader:
+            if metrics is not None:
+                metrics.count("result_cache_coalesced")
+            seen = set()
+            for pos, item in enumerate(flight.follow()):
+                seen.add(pos if item_key is None else item_key(item))
+                yield item
+            if flight.aborted:
+                # 앞선 실행이 중간에 멈췄으면 나머지는 직접 계산한다
+                for pos, item in enumerate(produce()):
+                    if (pos if item_key is None else item_key(item)) not in seen:
+                        yield item
+            return
+        completed = False
+        try:
+            for item in produce():
+                flight.append(item)
+                yield item
+            completed = True
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.close(aborted=not completed)
+        if cacheable is None or cacheable(flight.items):
+            self._store(key, flight.items)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+_default_cache = ResultCache()
+
+
+def get_result_cache():
+    """프로세스 공용 결과 캐시"""
+    return _default_cache
@@ -0,0 +1,146 @@
+"""CompiledQuery 마이크로 벤치마크.
+
+큰 법령 하나를 만들어 놓고, 질의마다 매번 정규식·조사표를 새로 만들던 예전 방식과
+CompiledQuery를 재사용하는 방식으로 검색과 개정문 덩어리 추출을 반복해 시간을 비교한다.
+
+    python bench/bench_compiled_query.py [--articles 3000] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import law_processor  # noqa: E402
+from make_fixtures import make_law  # noqa: E402
+from law_match import AhoCorasick  # noqa: E402
+from law_model import parse_law  # noqa: E402
+
+# 예전 구현: 호출할 때마다 정규식을 만들고 접미사·조사 목록을 정렬하고 조사 규칙을 새로 따진다
+def legacy_highlight(text, query):
+    if not query or not text:
+        return text
+    return re.compile(f'({re.escape(query)})', re.IGNORECASE).sub(r'<mark>\1</mark>', text)
+
+
+def legacy_extract_chunk_and_josa(token, searchword):
+    suffix_exclude = ["의", "에", "에서", "으로서", "등", "에게", "만", "만을", "만이", "만은", "만에", "만으로"]
+    josa_list = ["을", "를", "과", "와", "이", "가", "이나", "나", "으로", "로", "은", "는", "란", "이란"]
+    suffix = None
+    for s in sorted(suffix_exclude, key=len, reverse=True):
+        if token.endswith(s) and len(token) > len(s):
+            suffix = s
+            token = token[:-len(s)]
+            break
+    josa = None
+    chunk = token
+    if not token.endswith(searchword):
+        for j in sorted(josa_list, key=len, reverse=True):
+            if token.endswith(searchword + j):
+                chunk = token[:-len(j)]
+                josa = j
+                break
+    if searchword in chunk:
+        return chunk, josa, suffix
+    return token, None, suffix
+
+
+def legacy_group_locations(loc_list):
+    formatted = []
+    for location in loc_list:
+        location = re.sub(r'제(?=항)', '', location)
+        location = re.sub(r'(\d+)\.호', r'\1호', location)
+        formatted.append(re.sub(r'([가-힣])\.목', r'\1목', location))
+    if len(formatted) == 1:
+        return formatted[0]
+    return 'ㆍ'.join(formatted[:-1]) + ' 및 ' + formatted[-1]
+
+
+def legacy_amendment(doc, find_word, replace_word):
+    chunk_map = defaultdict(list)
+    for article in doc.articles:
+        for 항 in article.paragraphs:
+            for 호 in 항.items:
+                lines = [(law_processor.clean(호.text), 호.tokens, 호.location)]
+                lines += [(law_processor.clean(line), tokens, 목.location)
+                          for 목 in 호.sub_items for line, tokens in zip(목.lines, 목.line_tokens)]
+                for text_clean, tokens, location in lines:
+                    if find_word not in text_clean:
+                        continue
+                    for token in tokens:
+                        if find_word in token:
+                            chunk, josa, suffix = legacy_extract_chunk_and_josa(token, find_word)
+                            chunk_map[(chunk, chunk.replace(find_word, replace_word), josa, suffix)].append(location)
+    lines = []
+    for (chunk, replaced, josa, suffix), locations in chunk_map.items():
+        orig, new = (chunk + suffix, replaced + suffix) if suffix else (chunk, replaced)
+        lines.append(f"{legacy_group_locations(sorted(set(locations)))} 중 {law_processor.apply_josa_rule(orig, new, josa)}")
+    return lines
+
+
+def legacy_search(doc, query):
+    keyword_clean = law_processor.clean(query)
+    hits = []
+    for article in doc.articles:
+        if keyword_clean in law_processor.clean(article.text):
+            hits.append(legacy_highlight(article.text, query))
+        for 항 in article.paragraphs:
+            for 호 in 항.items:
+                if keyword_clean in law_processor.clean(호.text):
+                    hits.append(legacy_highlight(호.text, query))
+    return hits
+
+
+def compiled_amendment(doc, cq):
+    chunk_map = law_processor.collect_chunks(doc, AhoCorasick([cq.query]), {cq.query: cq})
+    return law_processor.format_amendment("①", "법", chunk_map, cq.josa_rule).split("\n")[1:]
+
+
+def compiled_search(doc, cq):
+    hits = []
+    for article in doc.articles:
+        if cq.keyword_clean in article.text_clean:
+            hits.append(cq.highlight(article.text))
+        for 항 in article.paragraphs:
+            for 호 in 항.items:
+                if cq.keyword_clean in 호.text_clean:
+                    hits.append(cq.highlight(호.text))
+    return hits
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--find", default="지방자치단체")
+    parser.add_argument("--replace", default="지자체")
+    args = parser.parse_args()
+
+    doc = parse_law(make_law(args.articles))
+    cq = law_processor.CompiledQuery(args.find, args.replace)
+    rows = [
+        ("search", lambda: legacy_search(doc, args.find), lambda: compiled_search(doc, cq)),
+        ("amendment", lambda: legacy_amendment(doc, args.find, args.replace), lambda: compiled_amendment(doc, cq)),
+    ]
+    print(f"{args.articles} articles, best of {args.repeat}")
+    for name, legacy, compiled in rows:
+        legacy_time, legacy_result = timed(legacy, args.repeat)
+        compiled_time, compiled_result = timed(compiled, args.repeat)
+        assert legacy_result == compiled_result, f"{name}: results differ"
+        print(f"{name:10s} legacy {legacy_time * 1000:8.1f} ms   compiled {compiled_time * 1000:8.1f} ms   x{legacy_time / compiled_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
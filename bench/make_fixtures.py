@@ -0,0 +1,80 @@
+"""벤치마크용 DRF 응답 묶음(fixture set)을 만든다.
+
+실제 응답을 녹화한 묶음(record_fixtures.py)과 같은 구조로, 결정적인 가짜 법령을 만들어 쓴다.
+수백 개 법령에 걸리는 넓은 검색어와 수천 조에 이르는 아주 큰 법령이 함께 들어 있다.
+
+    python bench/make_fixtures.py bench/fixtures/synthetic [--laws 300] [--large 3000,1500]
+
+묶음 구조:
+    manifest.json         {"laws": [{"MST", "법령명", "knd"}, ...]}
+    laws/<MST>.xml        lawService.do 응답
+    search/<키>-<쪽>.xml  (녹화한 경우만) lawSearch.do 응답
+"""
+import argparse
+import json
+import os
+import random
+
+WORDS = ["지방자치단체", "국가", "행정기관", "공무원", "위원회", "장관", "법인", "사업자", "시설", "기관"]
+JOSA = ["을", "를", "과", "와", "이", "가", "으로", "로", "은", "는", "의", "에", "에서", "", "등", "만을", "이란", "란"]
+CIRCLED = "①②③④⑤"
+SUB_ITEMS = "가나다라"
+
+
+def make_law(articles, seed=0, name="벤치법"):
+    """조문단위 → 항 → 호 → 목 구조의 가짜 lawService XML"""
+    rnd = random.Random(seed)
+
+    def sentence():
+        return " ".join(rnd.choice(WORDS) + rnd.choice(JOSA) for _ in range(rnd.randint(6, 14))) + "."
+
+    out = [f"<법령><기본정보><법령명_한글>{name}</법령명_한글></기본정보><조문>"]
+    for a in range(1, articles + 1):
+        가지 = "2" if rnd.random() < 0.05 else ""
+        out.append(f"<조문단위><조문번호>{a}</조문번호><조문가지번호>{가지}</조문가지번호><조문내용>제{a}조(목적) {sentence()}</조문내용>")
+        for p in range(rnd.randint(0, 3)):
+            number = CIRCLED[p] if rnd.random() < 0.9 else ""
+            out.append(f"<항><항번호>{number}</항번호><항내용>{number} {sentence()}</항내용>")
+            for h in range(1, rnd.randint(1, 5)):
+                out.append(f"<호><호번호>{h}.</호번호><호내용>{h}. {sentence()}</호내용>")
+                for m in range(rnd.randint(0, 3)):
+                    lines = "\n".join(f"  {SUB_ITEMS[m]}. {sentence()}" for _ in range(rnd.randint(1, 2)))
+                    out.append(f"<목><목번호>{SUB_ITEMS[m]}.</목번호><목내용><![CDATA[{lines}]]></목내용></목>")
+                out.append("</호>")
+            out.append("</항>")
+        out.append("</조문단위>")
+    out.append("</조문></법령>")
+    return "".join(out).encode()
+
+
+def write_fixture_set(directory, laws=300, large=(3000, 1500), seed=0):
+    """laws개의 보통 크기 법령과 large에 적은 조문 수의 큰 법령으로 묶음을 만든다"""
+    rnd = random.Random(seed)
+    os.makedirs(os.path.join(directory, "laws"), exist_ok=True)
+    manifest = []
+    sizes = list(large) + [rnd.randint(5, 80) for _ in range(laws)]
+    for i, articles in enumerate(sizes):
+        mst = str(900000 + i)
+        name = f"벤치법{i:04d}"
+        with open(os.path.join(directory, "laws", f"{mst}.xml"), "wb") as f:
+            f.write(make_law(articles, seed=seed * 100003 + i, name=name))
+        manifest.append({"MST": mst, "법령명": name, "knd": "A0002"})
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"laws": manifest}, f, ensure_ascii=False, indent=1)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 DRF 응답 묶음을 만든다")
+    parser.add_argument("directory")
+    parser.add_argument("--laws", type=int, default=300)
+    parser.add_argument("--large", default="3000,1500", help="큰 법령들의 조문 수(쉼표로 구분)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    large = [int(n) for n in args.large.split(",") if n]
+    manifest = write_fixture_set(args.directory, args.laws, large, args.seed)
+    print(f"{len(manifest)} laws written to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""실제 law.go.kr DRF 응답을 fixture 묶음으로 녹화한다.
+
+검색어마다 lawSearch.do 모든 페이지와, 목록에 나온 법령의 lawService.do 본문을 저장한다.
+OC 할당량을 쓰므로 필요할 때만 돌린다.
+
+    OC=... python bench/record_fixtures.py bench/fixtures/recorded 국가 지방자치단체 공무원
+"""
+import argparse
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from law_client import get_client  # noqa: E402
+from stub_server import recorded_search_path  # noqa: E402
+
+PAGE_SIZE = 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description="law.go.kr DRF 응답을 fixture 묶음으로 녹화한다")
+    parser.add_argument("directory")
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("--knd", default="A0002")
+    args = parser.parse_args()
+
+    client = get_client()
+    os.makedirs(os.path.join(args.directory, "laws"), exist_ok=True)
+    os.makedirs(os.path.join(args.directory, "search"), exist_ok=True)
+    manifest_path = os.path.join(args.directory, "manifest.json")
+    laws = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            laws = {law["MST"]: law for law in json.load(f)["laws"]}
+
+    for query in args.queries:
+        exact_query = f'"{query}"'
+        page = 1
+        while True:
+            body = client.get("lawSearch", target="law", type="XML", display=PAGE_SIZE, page=page,
+                              search=2, knd=args.knd, query=exact_query)
+            with open(recorded_search_path(args.directory, exact_query, args.knd, page), "wb") as f:
+                f.write(body)
+            rows = ET.fromstring(body).findall("law")
+            for row in rows:
+                mst = row.findtext("법령일련번호", "")
+                laws.setdefault(mst, {"MST": mst, "법령명": row.findtext("법령명한글", "").strip(), "knd": args.knd})
+            if len(rows) < PAGE_SIZE:
+                break
+            page += 1
+        print(f"{query}: {page} page(s)")
+
+    for mst in laws:
+        path = os.path.join(args.directory, "laws", f"{mst}.xml")
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(client.get("lawService", target="law", MST=mst, type="XML"))
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"laws": list(laws.values())}, f, ensure_ascii=False, indent=1)
+    print(f"{len(laws)} laws in {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""오프라인 벤치마크.
+
+fixture 묶음을 로컬 스텁 서버로 띄워 놓고 run_search_logic / run_amendment_logic 전체와
+단계별(목록 조회, 본문 받기, 파싱, 매칭, 출력 만들기) 시간을 잰다. 결과는 JSON 파일로 남겨
+리비전끼리 비교할 수 있다.
+
+    python bench/make_fixtures.py bench/fixtures/synthetic
+    python bench/run_bench.py bench/fixtures/synthetic -o bench_results.json --latency 0.05 --jitter 0.02
+    python bench/run_bench.py bench/fixtures/synthetic -o new.json --compare bench_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "app"))
+
+from stub_server import start_server  # noqa: E402
+
+
+def _configure_environment(base_url, args):
+    # law_* 모듈은 import할 때 환경변수를 읽으므로 import 전에 정해 둔다.
+    # 캐시는 모두 꺼서 매 반복이 목록 조회부터 파싱까지 전 과정을 다시 하게 한다.
+    os.environ["LAW_API_BASE"] = base_url
+    os.environ["LAW_API_RATE"] = str(args.rate)
+    os.environ["LAW_CACHE_MAX_BYTES"] = "0"
+    os.environ["LIST_CACHE_TTL"] = "0"
+    os.environ["LAW_MODEL_CACHE_SIZE"] = "0"
+    os.environ["LAW_INDEX"] = "0"
+    os.environ["RESULT_CACHE_TTL"] = "0"
+    os.environ["FETCH_WORKERS"] = str(args.workers)
+
+
+def _measure(fn, repeat):
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - started)
+    return seconds, result
+
+
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    import law_processor
+    from law_match import AhoCorasick
+    from law_model import parse_law
+
+    benchmarks = []
+
+    def bench(name, fn, **extra):
+        seconds, result = _measure(fn, args.repeat)
+        entry = {"name": name, "seconds": seconds, "min": min(seconds), "median": statistics.median(seconds), **extra}
+        benchmarks.append(entry)
+        print(f"{name:40s} min {entry['min'] * 1000:9.1f} ms   median {entry['median'] * 1000:9.1f} ms")
+        return result
+
+    for query in args.queries:
+        laws = bench(f"search[{query}]/listing", lambda: law_processor.get_law_list_from_api(query))
+        bodies = bench(f"search[{query}]/fetch", lambda: [x for _, x, _ in law_processor.iter_law_texts(laws)],
+                       laws=len(laws))
+        docs = bench(f"search[{query}]/parse", lambda: [parse_law(x) for x in bodies if x],
+                     bytes=sum(len(x) for x in bodies if x))
+        cq = law_processor.CompiledQuery(query)
+        bench(f"search[{query}]/match", lambda: [law_processor.search_law(doc, cq) for doc in docs])
+        bench(f"search[{query}]/end_to_end", lambda: law_processor.run_search_logic(query))
+
+    for pair in args.pairs:
+        find_word, replace_word = pair.split(",", 1)
+        laws = law_processor.get_law_list_from_api(find_word)
+        bodies = [x for _, x, _ in law_processor.iter_law_texts(laws)]
+        docs = [parse_law(x) for x in bodies if x]
+        matcher = AhoCorasick([find_word])
+        cq = law_processor.CompiledQuery(find_word, replace_word)
+        chunk_maps = bench(f"amend[{pair}]/match",
+                           lambda: [law_processor.collect_chunks(doc, matcher, {find_word: cq}) for doc in docs],
+                           laws=len(docs))
+        bench(f"amend[{pair}]/render",
+              lambda: [law_processor.format_amendment(law_processor.amendment_prefix(i), "법", m, cq.josa_rule)
+                       for i, m in enumerate(chunk_maps) if m])
+        bench(f"amend[{pair}]/end_to_end", lambda: law_processor.run_amendment_logic(find_word, replace_word))
+
+    if len(args.pairs) > 1:
+        pairs = [tuple(p.split(",", 1)) for p in args.pairs]
+        bench("amend[batch]/end_to_end", lambda: law_processor.run_batch_amendment_logic(pairs))
+    return benchmarks
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {b["name"]: b for b in json.load(f)["benchmarks"]}
+    print(f"\ncompared with {baseline_path}")
+    for entry in current:
+        old = baseline.get(entry["name"])
+        if old:
+            print(f"{entry['name']:40s} {old['median'] * 1000:9.1f} → {entry['median'] * 1000:9.1f} ms"
+                  f"   x{old['median'] / entry['median']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크")
+    parser.add_argument("fixtures", help="make_fixtures.py나 record_fixtures.py로 만든 묶음 디렉터리")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=0, help="클라이언트 초당 요청 제한(0이면 없음)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queries", nargs="*", default=["국가", "지방자치단체"])
+    parser.add_argument("--pairs", nargs="*", default=["지방자치단체,지자체", "공무원,직원"],
+                        help="찾을 단어,바꿀 단어")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.fixtures, latency=args.latency, jitter=args.jitter)
+    _configure_environment(base_url, args)
+    try:
+        benchmarks = run(args)
+    finally:
+        server.shutdown()
+
+    report = {
+        "revision": _revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "benchmarks": benchmarks,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"\nwritten to {args.output}")
+    if args.compare:
+        compare(benchmarks, args.compare)
+
+
+if __name__ == "__main__":
+    main()
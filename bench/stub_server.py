@@ -0,0 +1,117 @@
+"""녹화한 DRF 응답을 돌려주는 로컬 lawSearch.do / lawService.do 스텁 서버.
+
+lawService.do는 laws/<MST>.xml을 그대로 돌려준다. lawSearch.do는 녹화한 페이지가 있으면 그것을,
+없으면 묶음 안의 본문에서 검색어(공백 무시)가 든 법령으로 목록을 만들어 돌려준다.
+요청마다 latency초에 0~jitter초를 더해 기다린다.
+
+    python bench/stub_server.py bench/fixtures/synthetic --port 8765 --latency 0.2 --jitter 0.1
+    LAW_API_BASE=http://127.0.0.1:8765 streamlit run app/law_editor_app.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def recorded_search_path(directory, query, knd, page):
+    """녹화한 lawSearch.do 응답을 두는 경로"""
+    key = hashlib.sha1(f"{knd}|{query}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, "search", f"{key}-{page}.xml")
+
+
+class FixtureStore:
+    """fixture 묶음을 메모리에 올려 둔다"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+            self.laws = json.load(f)["laws"]
+        self.bodies = {}
+        self.cleaned = {}
+        for law in self.laws:
+            with open(os.path.join(directory, "laws", f"{law['MST']}.xml"), "rb") as f:
+                body = f.read()
+            self.bodies[law["MST"]] = body
+            self.cleaned[law["MST"]] = _SPACE_RE.sub("", body.decode("utf-8"))
+
+    def search_page(self, query, knd, page, display):
+        path = recorded_search_path(self.directory, query, knd, page)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+        term = _SPACE_RE.sub("", query.strip('"'))
+        hits = [law for law in self.laws
+                if (not knd or law.get("knd", "A0002") == knd) and (not term or term in self.cleaned[law["MST"]])]
+        rows = hits[(page - 1) * display: page * display]
+        body = [f"<LawSearch><totalCnt>{len(hits)}</totalCnt><page>{page}</page>"]
+        for i, law in enumerate(rows, (page - 1) * display + 1):
+            body.append(f'<law id="{i}"><법령일련번호>{law["MST"]}</법령일련번호>'
+                        f'<법령명한글>{escape(law["법령명"])}</법령명한글></law>')
+        body.append("</LawSearch>")
+        return "".join(body).encode("utf-8")
+
+
+def make_handler(store, latency=0.0, jitter=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=b""):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if latency or jitter:
+                time.sleep(latency + random.random() * jitter)
+            if url.path.endswith("/lawSearch.do"):
+                page = int(params.get("page", "1"))
+                display = int(params.get("display", "20"))
+                self._send(200, store.search_page(params.get("query", ""), params.get("knd", ""), page, display))
+            elif url.path.endswith("/lawService.do"):
+                body = store.bodies.get(params.get("MST", ""))
+                self._send(200, body) if body is not None else self._send(404)
+            else:
+                self._send(404)
+
+    return Handler
+
+
+def start_server(directory, host="127.0.0.1", port=0, latency=0.0, jitter=0.0):
+    """백그라운드 스레드로 서버를 띄우고 (server, base_url)을 돌려준다"""
+    server = ThreadingHTTPServer((host, port), make_handler(FixtureStore(directory), latency, jitter))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화한 DRF 응답을 돌려주는 로컬 스텁 서버")
+    parser.add_argument("fixtures")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="요청마다 기다릴 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency에 더할 임의 시간의 최대값(초)")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(FixtureStore(args.fixtures), args.latency, args.jitter))
+    print(f"serving {args.fixtures} on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""테스트 공용 준비.
+
+bench/make_fixtures.py로 만든 작은 fixture 묶음을 bench/stub_server.py로 띄우고 law_processor를 그 서버에 붙인다.
+law_* 모듈은 import할 때 환경변수를 읽으므로 서버를 띄우고 환경변수를 정한 뒤에 import한다.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+from make_fixtures import write_fixture_set  # noqa: E402
+from stub_server import start_server  # noqa: E402
+
+# tests/data/baseline_digests.json을 만든 묶음과 같아야 한다
+FIXTURE_LAWS = 22
+FIXTURE_LARGE = (120,)
+FIXTURE_SEED = 0
+
+
+@pytest.fixture(scope="session")
+def work_dir():
+    """테스트가 만드는 파일을 두는 임시 디렉터리"""
+    return tempfile.mkdtemp(prefix="law_tests_")
+
+
+@pytest.fixture(scope="session")
+def fixture_dir(work_dir):
+    """make_fixtures.py로 만든 fixture 묶음 디렉터리"""
+    fixtures = os.path.join(work_dir, "fixtures")
+    write_fixture_set(fixtures, FIXTURE_LAWS, FIXTURE_LARGE, FIXTURE_SEED)
+    return fixtures
+
+
+@pytest.fixture(scope="session")
+def law_processor(work_dir, fixture_dir):
+    """스텁 서버에 붙인 law_processor. 디스크 캐시·목록 캐시·색인은 끈다"""
+    server, base_url = start_server(fixture_dir)
+    os.environ.update({
+        "LAW_API_BASE": base_url,
+        "LAW_API_RATE": "0",
+        "LAW_HTTP_RETRIES": "0",
+        "LAW_CACHE_MAX_BYTES": "0",
+        "LIST_CACHE_TTL": "0",
+        "LAW_INDEX": "0",
+        "LAW_MIRROR_DIR": os.path.join(work_dir, "mirror"),
+    })
+    import law_client
+    import law_processor
+    # 다른 테스트 파일이 law_client를 먼저 import했으면 기본값이 환경변수를 바꾸기 전 것이므로 직접 만든다
+    law_client._default_client = law_client.LawClient(base_url, retries=0, rate=0)
+    yield law_processor
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def result_cache(monkeypatch):
+    """테스트마다 비어 있는 결과 캐시"""
+    import law_result_cache
+    cache = law_result_cache.ResultCache(ttl=600)
+    monkeypatch.setattr(law_result_cache, "_default_cache", cache)
+    return cache
@@ -0,0 +1,37 @@
+"""검색·개정문 결과가 처음 판(baseline 커밋)의 law_processor와 같은지 본다.
+
+tests/data/baseline_digests.json은 처음 판의 run_search_logic / run_amendment_logic을 conftest와 같은
+fixture 묶음에 돌린 결과의 SHA-256이다. 검색은 법령별로 조문 HTML을 줄바꿈으로 이은 값, 개정문은 항목별 값이다.
+"""
+import hashlib
+import json
+import os
+
+import pytest
+
+with open(os.path.join(os.path.dirname(__file__), "data", "baseline_digests.json"), encoding="utf-8") as f:
+    BASELINE = json.load(f)
+
+
+def digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@pytest.mark.parametrize("query", sorted(BASELINE["search"]))
+def test_search_matches_baseline(law_processor, query):
+    result = law_processor.run_search_logic(query, unit="법률")
+    assert {name: digest("\n".join(sections)) for name, sections in result.items()} == BASELINE["search"][query]
+
+
+@pytest.mark.parametrize("pair", sorted(BASELINE["amendment"]))
+def test_amendment_matches_baseline(law_processor, pair):
+    find_word, replace_word = pair.split(",")
+    result = law_processor.run_amendment_logic(find_word, replace_word)
+    assert [digest(text) for text in result] == BASELINE["amendment"][pair]
+
+
+def test_amendment_numbering_past_twenty(law_processor):
+    result = law_processor.run_amendment_logic("공무원", "직원")
+    assert len(result) > 20
+    assert result[19].startswith("⑳ ")
+    assert result[20].startswith("(21) ")
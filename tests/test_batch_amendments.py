@@ -0,0 +1,38 @@
+"""여러 단어 쌍을 한꺼번에 개정할 때 찾을 단어끼리 겹치는 경우"""
+import re
+
+from law_match import AhoCorasick
+
+# 개정문 한 줄: <위치> 중 "<찾은 말>"을 "<바꿀 말>"로 한다.
+_RULE_RE = re.compile(r'"([^"]+)"[을를]? "([^"]*)"')
+
+
+def _rules(texts):
+    return [pair for text in texts for pair in _RULE_RE.findall(text)]
+
+
+def test_find_longest_prefers_leftmost_then_longest():
+    matcher = AhoCorasick(["자치단체", "지방자치단체", "단체장"])
+    assert matcher.find_longest("지방자치단체장을") == [(0, "지방자치단체")]
+    assert matcher.find_longest("자치단체장") == [(0, "자치단체")]
+
+
+def test_contained_word_does_not_add_rules(law_processor):
+    """fixture 본문의 자치단체는 모두 지방자치단체 안에 있으므로 결과는 지방자치단체만 바꾼 것과 같다"""
+    batch = law_processor.run_batch_amendment_logic([("지방자치단체", "지자체"), ("자치단체", "자치구")])
+    assert batch == law_processor.run_amendment_logic("지방자치단체", "지자체")
+    assert not any("자치구" in replaced for _, replaced in _rules(batch))
+
+
+def test_overlapping_words_give_one_rule_per_token(law_processor):
+    """행정기관 안의 기관은 행정기관 규칙만 받고, 따로 쓰인 기관만 기관 규칙을 받는다"""
+    batch = law_processor.run_batch_amendment_logic([("행정기관", "행정청"), ("기관", "곳")])
+    rules = _rules(batch)
+    assert any(found.startswith("행정기관") for found, _ in rules)
+    assert any(found.startswith("기관") for found, _ in rules)
+    assert not any("행정곳" in replaced for _, replaced in rules)
+    # 같은 찾은 말이 한 법령 안에서 서로 다른 말로 바뀌면 안 된다
+    for text in batch:
+        replacements = {}
+        for found, replaced in _RULE_RE.findall(text):
+            assert replacements.setdefault(found, replaced) == replaced
@@ -0,0 +1,114 @@
+"""시간 제한으로 멈췄다가 이어서 할 때 번호와 결과, 결과 캐시"""
+import json
+import threading
+import time
+
+import pytest
+
+# 항목 하나를 내놓자마자 멈출 만큼 짧은 시간 제한
+TINY_BUDGET = 1e-9
+
+
+def _run_in_slices(run, **kwargs):
+    """시간 제한에 걸릴 때마다 continuation으로 이어서 끝까지 돌린다. (항목 목록, 나눠 돈 횟수)"""
+    items = []
+    resume = None
+    slices = 0
+    while True:
+        continuation = {}
+        items.extend(run(budget=TINY_BUDGET, resume=resume, continuation=continuation, **kwargs))
+        slices += 1
+        if not continuation:
+            return items, slices
+        resume = continuation
+
+
+def test_resumed_amendment_numbering(law_processor):
+    items, slices = _run_in_slices(lambda **kw: law_processor.iter_amendments("공무원", "직원", **kw))
+    full = law_processor.run_amendment_logic("공무원", "직원")
+    assert slices > 1
+    indexes = [item["index"] for item in items]
+    assert len(indexes) == len(set(indexes)) == items[0]["total"]
+    texts = [item["text"] for item in sorted(items, key=lambda item: item["index"]) if item["text"]]
+    assert texts == full
+    for item in items:
+        if item["text"]:
+            assert item["text"].startswith(law_processor.amendment_prefix(item["index"]) + " ")
+    assert law_processor.amendment_prefix(19) == "⑳"
+    assert law_processor.amendment_prefix(20) == "(21)"
+
+
+def test_resumed_search_matches_full_run(law_processor):
+    items, slices = _run_in_slices(lambda **kw: law_processor.iter_search_results("행정기관", **kw))
+    assert slices > 1
+    resumed = {item["법령명"]: item["sections"] for item in items if item["sections"]}
+    assert resumed == law_processor.run_search_logic("행정기관")
+
+
+def test_continuation_token_counts(law_processor):
+    continuation = {}
+    first = list(law_processor.iter_amendments("공무원", "직원", budget=TINY_BUDGET, continuation=continuation))
+    part = continuation["parts"]["법률"]
+    assert continuation["kind"] == "amend"
+    assert part["total"] == first[0]["total"]
+    assert len(part["remaining"]) == part["total"] - len(first)
+    assert not {rank for rank, _ in part["remaining"]} & {item["index"] for item in first}
+    assert sorted(rank for rank, _ in part["done"]) == sorted(item["index"] for item in first)
+
+
+def test_continuation_token_is_json(law_processor, result_cache):
+    """토큰에는 목록 순번과 MST만 들어 있어 JSON으로 옮겨도 이어서 할 수 있고, 끝까지 하면 결과가 캐시에 남는다"""
+    continuation = {}
+    items = list(law_processor.iter_search_results("행정기관", budget=TINY_BUDGET, continuation=continuation))
+    text = json.dumps(continuation, ensure_ascii=False)
+    assert "<mark>" not in text
+    rest = list(law_processor.iter_search_results("행정기관", resume=json.loads(text)))
+    assert sorted(item["index"] for item in items + rest) == list(range(items[0]["total"]))
+    hits = result_cache.stats()["hits"]
+    list(law_processor.iter_search_results("행정기관"))
+    assert result_cache.stats()["hits"] == hits + 1
+
+
+@pytest.mark.parametrize("run", ["search", "amend"])
+def test_finished_resume_is_cached(law_processor, result_cache, run):
+    """이어서 끝까지 한 결과는 처음부터 한 번에 한 것과 같은 key로 결과 캐시에 남는다"""
+    if run == "search":
+        def start(**kw):
+            return law_processor.iter_search_results("지방자치단체", **kw)
+    else:
+        def start(**kw):
+            return law_processor.iter_amendments("지방자치단체", "지자체", **kw)
+    items, _ = _run_in_slices(start)
+    hits = result_cache.stats()["hits"]
+    again = list(start())
+    assert result_cache.stats()["hits"] == hits + 1
+    assert sorted(item["index"] for item in again) == sorted(item["index"] for item in items)
+
+
+def test_follower_of_aborted_run_with_different_order(law_processor, result_cache, monkeypatch):
+    """본문을 가진 법령부터 처리하므로 같은 검색이라도 실행마다 순서가 다를 수 있다.
+    앞선 실행이 멈추면 기다리던 실행은 순서와 상관없이 빠진 법령 없이 끝까지 받아야 한다"""
+    full = law_processor.run_search_logic("행정기관")
+    result_cache._entries.clear()
+
+    leader = law_processor.iter_search_results("행정기관")
+    first = [next(leader) for _ in range(3)]
+    plan = law_processor._plan
+
+    def reversed_plan(*args, **kwargs):
+        ranked, total = plan(*args, **kwargs)
+        return ranked[::-1], total
+
+    monkeypatch.setattr(law_processor, "_plan", reversed_plan)
+    followed = {}
+    follower = threading.Thread(target=lambda: followed.update(law_processor.run_search_logic("행정기관")))
+    follower.start()
+    deadline = time.monotonic() + 10
+    while result_cache.stats()["coalesced"] < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    leader.close()
+    follower.join(timeout=60)
+    assert not follower.is_alive()
+    assert len(first) == 3
+    assert followed == full
@@ -0,0 +1,163 @@
+"""LawClient의 재시도·백오프, 200이 아닌 응답, 호출 속도 제한을 스텁 서버로 본다"""
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from law_client import LawApiError, LawClient, TokenBucket
+from stub_server import FixtureStore, make_handler
+
+
+class ScriptedServer:
+    """앞쪽 요청들에는 script에 적은 응답(상태 코드나 ("sleep", 초))을 주고, 그 뒤로는 fixture를 돌려주는 스텁"""
+
+    def __init__(self, store, script=()):
+        self.script = list(script)
+        self.requests = 0
+        scripted = self
+        base = make_handler(store)
+
+        class Handler(base):
+            def do_GET(self):
+                with lock:
+                    scripted.requests += 1
+                    step = scripted.script.pop(0) if scripted.script else None
+                if step is None:
+                    super().do_GET()
+                elif isinstance(step, tuple):
+                    time.sleep(step[1])
+                    super().do_GET()
+                else:
+                    self._send(step)
+
+        lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(scope="module")
+def store(fixture_dir):
+    return FixtureStore(fixture_dir)
+
+
+@pytest.fixture
+def stub(store):
+    servers = []
+
+    def start(script=()):
+        server = ScriptedServer(store, script)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def _client(base, **kwargs):
+    options = {"retries": 3, "backoff": 0.01, "rate": 0, "timeout": 2}
+    options.update(kwargs)
+    return LawClient(base, **options)
+
+
+def test_retries_5xx_then_succeeds(stub, store):
+    server = stub([503, 503])
+    mst = store.laws[0]["MST"]
+    body = _client(server.base).get("lawService", target="law", MST=mst, type="XML")
+    assert body == store.bodies[mst]
+    assert server.requests == 3
+
+
+def test_gives_up_after_retries(stub):
+    server = stub([502] * 10)
+    with pytest.raises(LawApiError) as raised:
+        _client(server.base, retries=2).get("lawService", target="law", MST="1", type="XML")
+    assert raised.value.status == 502
+    assert server.requests == 3
+
+
+def test_backoff_grows(stub):
+    server = stub([503, 503, 503])
+    started = time.monotonic()
+    _client(server.base, backoff=0.05).get("lawSearch", target="law", type="XML", query="국가")
+    # 0.05 + 0.1 + 0.2초 이상 기다린다
+    assert time.monotonic() - started >= 0.35
+    assert server.requests == 4
+
+
+def test_non_200_raises_without_retry(stub):
+    server = stub()
+    with pytest.raises(LawApiError) as raised:
+        _client(server.base).get("lawService", target="law", MST="no-such-mst", type="XML")
+    assert raised.value.status == 404
+    assert server.requests == 1
+
+
+def test_retries_timeout(stub, store):
+    server = stub([("sleep", 1.0)])
+    mst = store.laws[0]["MST"]
+    assert _client(server.base, timeout=0.2).get("lawService", target="law", MST=mst, type="XML") == store.bodies[mst]
+    assert server.requests == 2
+
+
+def test_timeout_after_retries_raises(stub):
+    server = stub([("sleep", 1.0)] * 3)
+    with pytest.raises(LawApiError) as raised:
+        _client(server.base, timeout=0.2, retries=1).get("lawSearch", target="law", type="XML", query="국가")
+    assert raised.value.status is None
+    assert server.requests == 2
+
+
+def test_connection_error_raises(stub):
+    server = stub()
+    base = server.base
+    server.close()
+    with pytest.raises(LawApiError):
+        _client(base, retries=1).get("lawSearch", target="law", type="XML", query="국가")
+
+
+def test_latency_recorded_per_endpoint(stub, store):
+    server = stub([503])
+    client = _client(server.base)
+    client.get("lawService", target="law", MST=store.laws[0]["MST"], type="XML")
+    stats = client.latency_stats()
+    assert list(stats) == ["lawService"]
+    assert stats["lawService"]["count"] == 2
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=50, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.05
+    for _ in range(5):
+        bucket.acquire()
+    # 순간 허용량을 쓴 뒤로는 초당 50개, 5개에 0.1초
+    assert time.monotonic() - started >= 0.09
+
+
+def test_token_bucket_disabled():
+    bucket = TokenBucket(rate=0, capacity=1)
+    started = time.monotonic()
+    for _ in range(1000):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.05
+
+
+def test_client_rate_limit(stub):
+    server = stub()
+    client = _client(server.base, rate=20, burst=1)
+    started = time.monotonic()
+    for _ in range(4):
+        client.get("lawSearch", target="law", type="XML", query="국가")
+    # 첫 요청 뒤 세 번은 0.05초씩 기다린다
+    assert time.monotonic() - started >= 0.14
+    assert server.requests == 4
@@ -0,0 +1,123 @@
+"""로컬 미러의 증분 동기화, 대체된 판본 지우기, 받기 실패, 중단 뒤 이어 받기"""
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import law_mirror
+from law_client import LawClient
+from law_mirror import LawMirror
+from stub_server import FixtureStore, make_handler
+
+
+@pytest.fixture
+def store(fixture_dir):
+    """테스트마다 따로 고칠 수 있는 fixture 묶음"""
+    return FixtureStore(fixture_dir)
+
+
+@pytest.fixture
+def mirror(store, tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(store))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = LawClient(f"http://127.0.0.1:{server.server_address[1]}", retries=0, rate=0)
+    monkeypatch.setattr(law_mirror, "get_client", lambda: client)
+    yield LawMirror(str(tmp_path / "mirror"))
+    server.shutdown()
+    server.server_close()
+
+
+def new_version(store, name, mst, body=True):
+    """name 법률을 MST가 mst인 새 판본으로 바꾼다. body=False이면 새 판본 본문은 받을 수 없다(404)"""
+    law = next(law for law in store.laws if law["법령명"] == name)
+    if body:
+        store.bodies[mst] = store.bodies[law["MST"]]
+    del store.bodies[law["MST"]]
+    law["MST"] = mst
+
+
+def listed(store):
+    return [{"법령명": law["법령명"], "MST": law["MST"]} for law in store.laws]
+
+
+def test_initial_sync(mirror, store):
+    result = mirror.sync(4)
+    assert result == {"added": len(store.laws), "downloaded": len(store.laws), "failed": 0, "skipped": 0, "removed": 0}
+    assert mirror.laws() == listed(store)
+    status = mirror.status()
+    assert status["stored"] == len(store.laws) and status["synced_at"]
+    first = store.laws[0]["MST"]
+    assert mirror.load(first) == (store.bodies[first], True)
+    # 바뀐 것이 없으면 아무것도 받지 않는다
+    assert mirror.sync(4) == {"added": 0, "downloaded": 0, "failed": 0, "skipped": 0, "removed": 0}
+
+
+def test_delta_sync_replaces_and_removes(mirror, store):
+    mirror.sync(4)
+    old = next(law["MST"] for law in store.laws if law["법령명"] == "벤치법0003")
+    new_version(store, "벤치법0003", "990003")
+    # 폐지된 법률과 새로 나온 법률
+    repealed = store.laws.pop(5)
+    store.laws.append({"MST": "990100", "법령명": "새법률", "knd": "A0002"})
+    store.bodies["990100"] = store.bodies[store.laws[0]["MST"]]
+
+    result = mirror.sync(4)
+    assert result["added"] == 2
+    assert result["downloaded"] == 2
+    assert result["removed"] == 2
+    assert mirror.laws() == listed(store)
+    for mst in (old, repealed["MST"]):
+        with pytest.raises(FileNotFoundError):
+            mirror.load(mst)
+    assert mirror.load("990003")[0] == store.bodies["990003"]
+    assert "990003" in {law["MST"] for law in mirror.find(["공무원"])}
+
+
+def test_failed_new_version_keeps_old_until_retry(mirror, store):
+    mirror.sync(4)
+    old = next(law["MST"] for law in store.laws if law["법령명"] == "벤치법0003")
+    old_body = store.bodies[old]
+    new_version(store, "벤치법0003", "990003", body=False)
+
+    for _ in range(law_mirror.MAX_FAILURES):
+        result = mirror.sync(4)
+        assert result["failed"] == 1
+        assert result["removed"] == 0
+        # 새 판본을 받기 전까지 이전 판본으로 찾고 읽는다
+        assert {"법령명": "벤치법0003", "MST": old} in mirror.laws()
+        assert mirror.load(old)[0] == old_body
+        assert mirror.status()["synced_at"]
+    assert result["skipped"] == 1
+    assert mirror.status()["failed"] == 1
+
+    # 건너뛰는 판본은 다시 받으려 하지 않는다
+    assert mirror.sync(4) == {"added": 0, "downloaded": 0, "failed": 0, "skipped": 1, "removed": 0}
+
+    store.bodies["990003"] = old_body
+    assert mirror.sync(4)["downloaded"] == 0
+    result = mirror.sync(4, retry_failed=True)
+    assert result == {"added": 0, "downloaded": 1, "failed": 0, "skipped": 0, "removed": 1}
+    assert mirror.laws() == listed(store)
+    assert mirror.status()["failed"] == 0
+    with pytest.raises(FileNotFoundError):
+        mirror.load(old)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_resume_after_interruption(mirror, store):
+    def stop_after_five(done, total):
+        if done == 5:
+            raise Interrupted
+
+    with pytest.raises(Interrupted):
+        mirror.sync(1, progress=stop_after_five)
+    assert mirror.status()["stored"] == 5
+    assert mirror.status()["synced_at"] is None
+
+    result = mirror.sync(4)
+    assert result == {"added": 0, "downloaded": len(store.laws) - 5, "failed": 0, "skipped": 0, "removed": 0}
+    assert mirror.laws() == listed(store)
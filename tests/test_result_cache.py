@@ -0,0 +1,74 @@
+import threading
+import time
+
+from law_result_cache import ResultCache
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 안에 조건을 만족하지 못했습니다"
+        time.sleep(0.01)
+
+
+def test_hit_after_complete_run():
+    cache = ResultCache(ttl=60)
+    calls = []
+
+    def produce():
+        calls.append(1)
+        yield from range(3)
+
+    assert list(cache.stream("k", produce)) == [0, 1, 2]
+    assert list(cache.stream("k", produce)) == [0, 1, 2]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_not_cached_when_not_cacheable():
+    cache = ResultCache(ttl=60)
+    assert list(cache.stream("k", lambda: iter([1, 2]), cacheable=lambda items: False)) == [1, 2]
+    assert cache.stats()["entries"] == 0
+
+
+def test_leader_abort_with_waiting_follower():
+    """앞선 실행이 중간에 멈추면 기다리던 요청은 받은 항목 뒤부터 직접 계산해 끝까지 받는다"""
+    cache = ResultCache(ttl=60)
+    calls = []
+
+    def produce():
+        calls.append(1)
+        yield from range(5)
+
+    leader = cache.stream("k", produce)
+    assert next(leader) == 0
+    followed = []
+    follower = threading.Thread(target=lambda: followed.extend(cache.stream("k", produce)))
+    follower.start()
+    _wait_until(lambda: cache.stats()["coalesced"] == 1)
+    # 시간 제한 등으로 앞선 실행을 받는 쪽이 멈춘다
+    leader.close()
+    follower.join(timeout=5)
+    assert not follower.is_alive()
+    assert followed == [0, 1, 2, 3, 4]
+    assert len(calls) == 2
+    # 중간에 멈춘 실행의 결과는 남기지 않는다
+    assert cache.stats()["entries"] == 0
+
+
+def test_follower_skips_by_item_key_when_order_differs():
+    """앞선 실행과 기다리던 요청의 처리 순서가 달라도 멈춘 뒤 빠지거나 겹치는 항목이 없다"""
+    cache = ResultCache(ttl=60)
+
+    leader = cache.stream("k", lambda: iter(range(5)), item_key=lambda item: item)
+    assert [next(leader), next(leader), next(leader)] == [0, 1, 2]
+    followed = []
+    follower = threading.Thread(
+        target=lambda: followed.extend(cache.stream("k", lambda: iter(range(4, -1, -1)), item_key=lambda item: item)))
+    follower.start()
+    _wait_until(lambda: cache.stats()["coalesced"] == 1)
+    leader.close()
+    follower.join(timeout=5)
+    assert not follower.is_alive()
+    assert sorted(followed) == [0, 1, 2, 3, 4]
+    assert len(followed) == 5